@@ -6,12 +6,16 @@
 __author__ = 'Adam Volin'
 __email__ = 'Adam.Volin56@spsmail.cuny.edu'
 
-# Imports
+# Imports. Modules only some commands need are imported where they
+# are used, so starting a batch run stays fast.
+import os
 import sys
-import argparse
+import math
 import random
+import struct
 import time
-from queue import Queue
+from array import array
+from functools import partial
 
 class Players(object):
     """This class is used to track the players for a game of Pig.
@@ -20,9 +24,12 @@ class Players(object):
     be accessed or set directly. This is ensures the integrity
     of the game.
 
+    The players are kept in a fixed sequence and the turn rotates by
+    moving an index through it, so any number of players is supported.
+
     Attributes:
-        _players (Queue): The players queue.
-        _current_player (Player): The currently dequeued player.
+        _players (tuple): The players, in turn order.
+        _index (int): The position of the current player.
     """
 
     def __init__(self, players):
@@ -30,49 +37,90 @@ class Players(object):
         The constructor for Players class. 
 
         Parameters: 
-            players (Queue): The queue holding the players. 
+            players (sequence): The players, in turn order. A Queue
+                                holding the players is also accepted.
         """
 
-        self._players = players
-        self._current_player = players.get()
+        self._players = tuple(getattr(players, "queue", players))
+        if not self._players:
+            raise ValueError("At least one player is required.")
+        self._index = 0
+
+        # Let every player know who they are playing against
+        for player in self._players:
+            player.set_opponents([opponent for opponent in self._players
+                                  if opponent is not player])
 
     def get_current_player(self):
         """ 
-        The getter for the _current_player attribute.
+        The getter for the current player.
 
         Returns:
             (Player): The current player.
         """
 
         # Return the current player
-        return self._current_player
+        return self._players[self._index]
 
     def get_next_player(self):
         """ 
-        A method to get the next player in the Players queue.
+        A method to move the turn to the next player.
 
         Returns:
             (Player): The current player.
         """
 
-        # Add the current player back to the end of the queue
-        self._players.put(self._current_player)
-        # Get the next player from the queue and return it
-        self._current_player = self._players.get()
-        return self._current_player
+        # Move to the next player, wrapping around to the first
+        self._index += 1
+        if self._index == len(self._players):
+            self._index = 0
+        return self._players[self._index]
+
+    def get_index(self):
+        """ 
+        The getter for the _index attribute.
+
+        Returns:
+            (int): The seat of the current player.
+        """
+
+        return self._index
+
+    def set_index(self, index):
+        """ 
+        The setter for the _index attribute.
+
+        Parameters:
+            index (int): The seat of the current player.
+        """
+
+        if not 0 <= index < len(self._players):
+            raise ValueError("There is no seat {}.".format(index))
+        self._index = index
+
+    def get_seats(self):
+        """ 
+        The getter for the players in turn order.
+
+        Returns:
+            (tuple): The players, starting with the first player.
+        """
+
+        # Return the fixed sequence
+        return self._players
 
     def get_players(self):
         """ 
         The getter for the _players attribute.
 
         Returns:
-            (list): The players in the queue.
+            (tuple): The players, starting with the player after the
+                     current player and ending with the current player.
         """
 
-        # Append the current player to the list and return it
-        players_list = list(self._players.queue)
-        players_list.append(self._current_player)
-        return players_list
+        # Rotate the sequence so the current player is last
+        start = self._index + 1
+        return self._players[start:] + self._players[:start]
 
 
 class Player(object):
@@ -88,8 +136,13 @@ class Player(object):
         _current_score (int): The player's score for the current turn.
         _rolls (int): The player's number of rolls.
         _last_roll (int): The player's last roll.
+        _opponents (list): The player's opponents.
     """
 
+    # Fixed attributes keep each player small
+    __slots__ = ('_name', '_total_score', '_current_score', '_total_rolls',
+                 '_last_roll', '_opponents')
+
     def __init__(self, name):
         """ 
         The constructor for Player class. 
@@ -103,6 +156,7 @@ class Player(object):
         self._current_score = 0
         self._total_rolls = 0
         self._last_roll = 0
+        self._opponents = []
 
     def get_name(self):
         """ 
@@ -159,6 +213,28 @@ class Player(object):
         # Return the player's last roll
         return self._last_roll
 
+    def get_opponents(self):
+        """ 
+        The getter for the _opponents attribute.
+
+        Returns:
+            (list): The player's opponents.
+        """
+
+        # Return the player's opponents
+        return self._opponents
+
+    def set_opponents(self, opponents):
+        """ 
+        The setter for the _opponents attribute.
+
+        Parameters: 
+            opponents (list): The player's opponents.
+        """
+
+        # Set the player's opponents
+        self._opponents = opponents
+
     def update_total_rolls(self):
         """ 
         Method to increment the _total_rolls attribute.
@@ -197,6 +273,28 @@ class Player(object):
         # Set the attribute value to 0
         self._current_score = 0
 
+    def get_state(self):
+        """ 
+        A method to get the player's scores and rolls.
+
+        Returns:
+            (tuple): The total score, current score, number of rolls
+                     and last roll.
+        """
+
+        return self._total_score, self._current_score, self._total_rolls, self._last_roll
+
+    def set_state(self, state):
+        """ 
+        A method to set the player's scores and rolls.
+
+        Parameters:
+            state (tuple): The total score, current score, number of
+                           rolls and last roll, as from get_state.
+        """
+
+        self._total_score, self._current_score, self._total_rolls, self._last_roll = state
+
     def commit_score(self):
         """ 
         Method to increment the _total_score and _total_rolls attributes.
@@ -205,22 +303,33 @@ class Player(object):
         # Update the player's total score and total roll count
         self._total_score += self._current_score
 
-    def request_action(self):
+    def request_action(self, timeout=None):
         """ 
         Method to return the player's desired action.
 
+        Parameters: 
+            timeout (float): The number of seconds to wait for the
+                             player. Defaults to None, which waits
+                             for as long as it takes.
+
         Returns:
-            (str): The player's desired action.
+            (str): The player's desired action, or None if the
+                   player did not answer in time.
         """
 
+        prompt = "Enter 'r' to roll the die, or 'h' to hold. What you you like to do? "
         # Return the player's input
-        return input("Enter 'r' to roll the die, or 'h' to hold. What you you like to do? ")
+        if timeout is None:
+            return input(prompt)
+        return timed_input(prompt, timeout)
 
 
 class ComputerPlayer(Player):
     """This class is used to store details about a computer player.
 
-    This class is a subclass of Player.
+    This class is a subclass of Player. The computer player rolls until
+    its turn score reaches its hold threshold or would take its total
+    to the target score.
 
     Attributes:
         _name (str): The player's name.
@@ -228,329 +337,2091 @@ class ComputerPlayer(Player):
         _current_score (int): The player's score for the current turn.
         _rolls (int): The player's number of rolls.
         _last_roll (int): The player's last roll.
+        _opponents (list): The player's opponents.
+        _hold_at (int): The turn score at which the player holds.
+        _target (int): The total score the player is playing to.
     """
-    
-    def request_action(self):
-        """ 
-        Method to return the computer player's desired action.
-
-        Returns:
-            (str): The computer player's desired action.
-        """
 
-        # Determine the computer player's desired action
-        action = "r" if self._current_score < min(25, (100 - (self._total_score + self._current_score))) else "h"
-        # Return the action
-        return action
+    __slots__ = ('_hold_at', '_target')
 
+    def __init__(self, name, hold_at=25, target=100, rules=None):
+        """ 
+        The constructor for ComputerPlayer class. 
 
-class PlayerFactory:
-    """This class is used to get the correct player type."""
-
-    def get_player(self, player_name, player_type):
+        Parameters: 
+            name (string): The player's name.
+            hold_at (int): The turn score at which the player holds.
+                           Defaults to 25. None holds at the turn total
+                           that maximizes the expected points of a turn
+                           under the rules.
+            target (int): The total score the player is playing to.
+                          Defaults to 100.
+            rules (Rules): The rules the player is playing by, which
+                           replace the target. Defaults to None.
         """
-        Returns the correct player type based on argument value
-        set on the command line.
 
-        Parameters: 
-            player_name (str): The player's name.
-            player_type (str): The type of player.
+        super().__init__(name)
+        if rules is not None:
+            target = rules.get_target()
+        if hold_at is None:
+            hold_at = (rules if rules is not None else STANDARD_RULES).get_hold_threshold()
+        self._hold_at = hold_at
+        self._target = target
+
+    def get_hold_at(self):
+        """ 
+        The getter for the _hold_at attribute.
 
         Returns:
-            (Player) or (ComputerPlayer)
+            (int): The turn score at which the player holds.
         """
 
-        # Return correct player class
-        if player_type == "human":
-            return Player(player_name)
-        if player_type == "computer":
-            return ComputerPlayer(player_name)
-
-
-class Die(object):
-    """This class is used to generate a die for a game."""
+        # Return the player's hold threshold
+        return self._hold_at
 
-    def __init__(self):
+    def get_target(self):
         """ 
-        The constructor for Player class. 
+        The getter for the _target attribute.
 
-        Seeds the random generator with 0.
+        Returns:
+            (int): The total score the player is playing to.
         """
 
-        # Set the seed to 0
-        random.seed(0)
-
-    def roll(self):
+        # Return the player's target score
+        return self._target
+    
+    def request_action(self, timeout=None):
         """ 
-        Method to 'roll' the die.
+        Method to return the computer player's desired action.
+
+        Parameters: 
+            timeout (float): Ignored, computer players answer at once.
 
         Returns:
-            (int): The result of the 'roll', an integer between 1 and 6
+            (str): The computer player's desired action.
         """
 
-        # Return a random integer between 1 and 6
-        return random.randint(1, 6)
+        # Determine the computer player's desired action. Holding on a
+        # turn score of 0 only passes the die, so the player always
+        # rolls then, even if the game's target is past its own
+        action = "r" if self._current_score == 0 or self._current_score < min(self._hold_at, (self._target - (self._total_score + self._current_score))) else "h"
+        # Return the action
+        return action
 
 
-class Game(object):
-    """This class is used to run a game of Pig.
+class PlayerTable(object):
+    """This class is used to store many computer players compactly.
 
-    The attributes of this class are protected as they should not
-    be accessed or set directly. Additionally, most functions of
-    this class are protected to prevent manipulation of the game.
-    This is ensures the integrity of the game.
+    Instead of one object per player, the players' details are kept in
+    parallel typed arrays, one entry per player, which takes a few bytes
+    per player. Every player follows the ComputerPlayer rule with the
+    table's hold threshold and target. Use get_player to work with a
+    single player through the usual Player methods.
 
     Attributes:
-        _players (Players): The instantiated players for this game.
-        _die (Die): The die instantiated for this game.
-        _active_turn (bool): Whether or not the game is in active turn.
-        _end_game (bool): Whether or not the game has ended.
+        _names (list): The players' names, or None for default names.
+        _total_scores (array): The players' total scores.
+        _current_scores (array): The players' scores for the current turn.
+        _total_rolls (array): The players' numbers of rolls.
+        _last_rolls (array): The players' last rolls.
+        _hold_at (int): The turn score at which the players hold.
+        _target (int): The total score the players are playing to.
     """
 
-    def __init__(self, players):
-        """ 
-        The constructor for Game class.
+    def __init__(self, size, names=None, hold_at=25, target=100):
+        """
+        The constructor for PlayerTable class.
 
-        Instantiates the players and die for the current game.
+        Parameters:
+            size (int): The number of players.
+            names (list): The players' names. Defaults to None, which
+                          names the players by their position.
+            hold_at (int): The turn score at which the players hold.
+                           Defaults to 25.
+            target (int): The total score the players are playing to.
+                          Defaults to 100.
+        """
 
-        Parameters: 
-            players (Queue): The players queue for the current game.
+        if names is not None and len(names) != size:
+            raise ValueError("Expected {} names, got {}.".format(size, len(names)))
+
+        self._names = names
+        self._total_scores = array('H', bytes(2 * size))
+        self._current_scores = array('H', bytes(2 * size))
+        self._total_rolls = array('L', [0]) * size
+        self._last_rolls = array('B', bytes(size))
+        self._hold_at = hold_at
+        self._target = target
+
+    def __len__(self):
+        """
+        Returns:
+            (int): The number of players.
         """
 
-        # Instantiate a Players object with the players queue
-        self._players = Players(players)
-        # Instantiate the Die to be used for the current game
-        self._die = Die()
-        # Track the game status
-        self._active_turn = True
-        self._end_game = False
+        return len(self._total_scores)
 
-    def start(self):
-        """The method to start the current game."""
+    def get_player(self, index):
+        """
+        A method to get a single player of the table.
 
-        # Call the protected _turn method to start the game
-        self._turn()
+        Parameters:
+            index (int): The position of the player.
 
-    def _accounce_winner(self):
-        """The method to announce the winner."""
+        Returns:
+            (PlayerView): The player.
+        """
 
-        winner = sorted(((player.get_name(), player.get_last_roll(), player.get_total_score())
-                       for player in self._players.get_players()),
-                             key=lambda player: (player[1]),
-                             reverse=True)[0]
+        if not 0 <= index < len(self):
+            raise IndexError("Player index out of range.")
+        return PlayerView(self, index)
 
-        print("\n\nCongratulations {}, you rolled a {} and your total score is {}. You won the game!"
-                              .format(winner[0], winner[1], winner[2]))
+    def get_name(self, index):
+        """
+        A method to get a player's name.
 
-    def _game_over(self):
+        Parameters:
+            index (int): The position of the player.
+
+        Returns:
+            (str): The player's name.
         """
-            The method to run at the end of the current game.
 
-            Prints a leaderboard with the scores and number of
-            rolls for each of the current game's players.
+        if self._names is None:
+            return "Player {}".format(index + 1)
+        return self._names[index].strip()
+
+    def get_total_scores(self):
         """
+        The getter for the _total_scores attribute.
 
-        # Get the players and create the leaderboard tuple
-        leaderboard = ((player.get_name(), player.get_total_score(), player.get_total_rolls())
-                       for player in self._players.get_players())
+        Returns:
+            (array): The players' total scores.
+        """
 
-        print("\nLEADERBOARD\n")
-        # Print leaderboard header border
-        print("+-{:<32}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10))
-        # Print the leaderboard header
-        print("| {:<32} | {:>10} | {:>10} |".format(
-            'Player', 'Score', '# of Rolls'))
-        # Sort by highest scores first and print the details
-        for player in sorted(leaderboard,
-                             key=lambda player: (player[1]),
-                             reverse=True):
-            # Print the cell separators
-            print("|-{:<32}-+-{:>10}-+-{:>10}-|".format("-"*32, "-"*10, "-"*10))
-            # Print the player's details
-            print("| {:<32} | {:>10} | {:>10} |".format(
-                player[0], player[1], player[2]))
+        return self._total_scores
 
-        # Print leaderboard footer border
-        print("+-{:<32}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10))
+    def get_total_rolls(self):
+        """
+        The getter for the _total_rolls attribute.
 
-    def _play(self, player):
+        Returns:
+            (array): The players' numbers of rolls.
         """
-        The method to control a player's turn.
 
-        Parameters: 
-            player (Player): The player who's turn it is.
+        return self._total_rolls
+
+    def record_roll(self, index, roll):
         """
+        A method to record a roll for a player in a single call.
 
-        # Request the current player's desired action
-        action = player.request_action()
+        Counts the roll, stores it as the last roll and either adds it
+        to the turn score or, on a 1, clears the turn score.
 
-        # Player chose to roll
-        if action == "r":
-            # Roll the die and add to roll total for the turn
-            roll = self._die.roll()
-            player.update_total_rolls()
-            player.update_last_roll(roll)
-            # If the player rolls 1, reset the current
-            # score and commit the current rolls count
-            # to the player's Player object, and exit
-            # the loop.
-            if roll == 1:
-                player.reset_turn_stats()
-                player.commit_score()
-                print("Ouch {}, you rolled a {} and lost all points you accumulated during this turn. Your score for this turn is {}. Your total score is {}.".format(
-                    player.get_name(), roll, player.get_current_score(), player.get_total_score()))
-                self._active_turn = False
-            # If the player rolled other than a 1, update the
-            # current score to the value of the roll, check
-            # to see if the player's total is >= 100 and end
-            # the game, otherwise ask the player for their
-            # next action
-            else:
-                player.update_turn_score(roll)
-                if (player.get_current_score() + player.get_total_score()) >= 100:
-                    player.commit_score()
-                    player.reset_turn_stats()
-                    self._end_game, self._active_turn = True, False
-                else:
-                    print("Nice {}! You rolled a {}. Your current score for this turn is {}. Your total score is {}".format(
-                            player.get_name(),
-                            roll,
-                            player.get_current_score(),
-                            player.get_current_score() + player.get_total_score()
-                        )
-                    )
-        # Player chose to hold, commit their current score and
-        # roll count to their Player object and exit the loop
-        elif action == "h":
-            player.commit_score()
-            print("{}, you held. Your score for this turn is {}. Your total score is {}.".format(
-                player.get_name(), player.get_current_score(), player.get_total_score()))
-            player.reset_turn_stats()
-            self._active_turn = False
-        # The player entered an invalid action
-        else:
-            print("You entered an invalid action.")
+        Parameters:
+            index (int): The position of the player.
+            roll (int): The roll.
 
-    def _turn(self, next_player=False):
+        Returns:
+            (int): The player's score for the current turn.
         """
-        The method to control player turns.
 
-        Parameters: 
-            next_player (bool): Used to decide if the next player
-                                should be called to play. Defaults
-                                to False.
+        self._total_rolls[index] += 1
+        self._last_rolls[index] = roll
+        score = self._current_scores[index] + roll if roll != 1 else 0
+        self._current_scores[index] = score
+        return score
+
+    def hold(self, index):
         """
+        A method to commit a player's turn score and end their turn.
 
-        # Get the player for the current turn
-        player = self._players.get_current_player(
-        ) if not next_player else self._players.get_next_player()
+        Parameters:
+            index (int): The position of the player.
+        """
 
-        # Reset the _active_turn attribute to True
-        self._active_turn = True
+        self._total_scores[index] += self._current_scores[index]
+        self._current_scores[index] = 0
 
-        # Let the players know who's turn it is
-        print("\n{}, it's your turn. Your current score is {}".format(
-            player.get_name(), player.get_total_score()))
+    def wants_roll(self, index):
+        """
+        A method to decide whether a player rolls, using the
+        ComputerPlayer rule.
 
-        # Keep the current player's turn until they roll a 1,
-        # win the game, or hold.
-        while self._active_turn and not self._end_game:
-            self._play(player)
+        Parameters:
+            index (int): The position of the player.
 
-        # Check to see if the game is over, if not go to the next player,
-        # otherwise call the protected _game_over function to trigger the
-        # leaderboard display
-        if not self._end_game:
-            self._turn(True)
-        else:
-            self._accounce_winner()
-            self._game_over()
+        Returns:
+            (bool): Whether or not the player rolls.
+        """
 
+        current = self._current_scores[index]
+        return current < min(self._hold_at, self._target - (self._total_scores[index] + current))
 
-class TimedGame(Game):
-    """This class is used to run a timed game of Pig.
 
-    Inherits from the Game class
+class PlayerView(object):
+    """This class is used to access one player of a PlayerTable.
+
+    It offers the same methods as Player, reading and writing the
+    player's entries in the table.
 
     Attributes:
-        _players (Players): The instantiated players for this game.
-        _die (Die): The die instantiated for this game.
-        _active_turn (bool): Whether or not the game is in active turn.
-        _end_game (bool): Whether or not the game has ended.
-        _end_time (time): The time the game was started.
+        _table (PlayerTable): The table holding the player.
+        _index (int): The position of the player in the table.
+        _opponents (list): The player's opponents.
     """
 
-    def start(self):
-        """The method to start the current game."""
-        # Call the protected _turn method to start the game
-        self._end_time = time.time() + 60
-        self._turn()
-
-    def _accounce_winner(self):
-        """The method to announce the winner."""
-        
-        if self._end_time < time.time():
-            winner = sorted(((player.get_name(), player.get_last_roll(), player.get_total_score())
-                       for player in self._players.get_players()),
-                             key=lambda player: (player[1]),
-                             reverse=True)[0]
-
-            print("\n\nCongratulations {}, you had the highest score of {} before time ran out. You won the game!"
-                              .format(winner[0], winner[2]))
-        else:
-            super()._accounce_winner()
+    __slots__ = ('_table', '_index', '_opponents')
 
-    def _play(self, player, time_left):
+    def __init__(self, table, index):
         """
-        The method to control a player's turn.
-        
-        Prints the time left in the game and then calls
-        the parent _play method.
+        The constructor for PlayerView class.
 
-        Parameters: 
-            player (Player): The player who's turn it is.
+        Parameters:
+            table (PlayerTable): The table holding the player.
+            index (int): The position of the player in the table.
         """
 
-        print("There are {} seconds left in this game.".format(time_left))
-        super()._play(player)
+        self._table = table
+        self._index = index
+        self._opponents = []
 
-    def _turn(self, next_player=False):
+    def get_name(self):
         """
-        The method to control player turns.
-
-        Parameters: 
-            next_player (bool): Used to decide if the next player
-                                should be called to play. Defaults
-                                to False.
+        Returns:
+            (str): The player's name.
         """
-        # Get the player for the current turn
-        player = self._players.get_current_player(
-        ) if not next_player else self._players.get_next_player()
 
-        # Reset the _active_turn attribute to True
-        self._active_turn = True
+        return self._table.get_name(self._index)
+
+    def get_total_score(self):
+        """
+        Returns:
+            (int): The player's total score.
+        """
+
+        return self._table._total_scores[self._index]
+
+    def get_current_score(self):
+        """
+        Returns:
+            (int): The player's current turn score.
+        """
+
+        return self._table._current_scores[self._index]
+
+    def get_total_rolls(self):
+        """
+        Returns:
+            (int): The player's number of rolls.
+        """
+
+        return self._table._total_rolls[self._index]
+
+    def get_last_roll(self):
+        """
+        Returns:
+            (int): The player's last roll.
+        """
+
+        return self._table._last_rolls[self._index]
+
+    def get_opponents(self):
+        """
+        Returns:
+            (list): The player's opponents.
+        """
+
+        return self._opponents
+
+    def set_opponents(self, opponents):
+        """
+        Parameters:
+            opponents (list): The player's opponents.
+        """
+
+        self._opponents = opponents
+
+    def update_total_rolls(self):
+        """Method to increment the player's number of rolls."""
+
+        self._table._total_rolls[self._index] += 1
+
+    def update_turn_score(self, score):
+        """
+        Method to increment the player's current turn score.
+
+        Parameters:
+            score (int): The amount to increment the current score by.
+        """
+
+        self._table._current_scores[self._index] += score
+
+    def update_last_roll(self, roll):
+        """
+        Method to set the player's last roll.
+
+        Parameters:
+            roll (int): The player's last roll.
+        """
+
+        self._table._last_rolls[self._index] = roll
+
+    def reset_turn_stats(self):
+        """Method to reset the player's current turn score."""
+
+        self._table._current_scores[self._index] = 0
+
+    def get_state(self):
+        """
+        A method to get the player's scores and rolls.
+
+        Returns:
+            (tuple): The total score, current score, number of rolls
+                     and last roll.
+        """
+
+        table, index = self._table, self._index
+        return (table._total_scores[index], table._current_scores[index],
+                table._total_rolls[index], table._last_rolls[index])
+
+    def set_state(self, state):
+        """
+        A method to set the player's scores and rolls.
+
+        Parameters:
+            state (tuple): The total score, current score, number of
+                           rolls and last roll, as from get_state.
+        """
+
+        table, index = self._table, self._index
+        (table._total_scores[index], table._current_scores[index],
+         table._total_rolls[index], table._last_rolls[index]) = state
+
+    def commit_score(self):
+        """Method to add the current turn score to the total score."""
+
+        self._table._total_scores[self._index] += self._table._current_scores[self._index]
+
+    def request_action(self, timeout=None):
+        """
+        Method to return the player's desired action.
+
+        Parameters:
+            timeout (float): Ignored, computer players answer at once.
+
+        Returns:
+            (str): The player's desired action.
+        """
+
+        return "r" if self._table.wants_roll(self._index) else "h"
+
+
+# The lines read from standard input by the background reader,
+# started by the first timed_input call
+_stdin_lines = None
+
+
+def _read_stdin(lines):
+    """
+    Reads standard input line by line into a queue until it closes.
+
+    Parameters:
+        lines (SimpleQueue): The queue the lines are put on. None is
+                             put on it when the input closes.
+    """
+
+    for line in sys.stdin:
+        lines.put(line.rstrip("\n"))
+    lines.put(None)
+
+
+def timed_input(prompt, timeout):
+    """
+    Asks for a line of input, giving up after a number of seconds.
+
+    Standard input is read by a background thread, so a line typed
+    after the timeout is not lost but answers the next prompt.
+
+    Parameters:
+        prompt (str): The prompt to print.
+        timeout (float): The number of seconds to wait.
+
+    Returns:
+        (str): The line that was entered, or None if the time ran out.
+    """
+
+    from queue import SimpleQueue, Empty
+    import threading
+
+    global _stdin_lines
+    if _stdin_lines is None:
+        _stdin_lines = SimpleQueue()
+        threading.Thread(target=_read_stdin, args=(_stdin_lines,), daemon=True).start()
+
+    print(prompt, end="", flush=True)
+    try:
+        line = _stdin_lines.get(timeout=max(timeout, 0))
+    except Empty:
+        print()
+        return None
+    if line is None:
+        raise EOFError("The input was closed.")
+    return line
+
+
+class PlayerFactory:
+    """This class is used to get the correct player type."""
+
+    def get_player(self, player_name, player_type):
+        """
+        Returns the correct player type based on argument value
+        set on the command line.
+
+        Parameters: 
+            player_name (str): The player's name.
+            player_type (str): The type of player.
+
+        Returns:
+            (Player), (ComputerPlayer), (OptimalComputerPlayer) or
+            (SearchComputerPlayer)
+        """
+
+        # Return correct player class
+        if player_type == "human":
+            return Player(player_name)
+        if player_type == "computer":
+            return ComputerPlayer(player_name)
+        if player_type == "optimal":
+            # Only load the policy table when it is needed
+            from pig_optimal import OptimalComputerPlayer
+            return OptimalComputerPlayer(player_name)
+        if player_type == "search":
+            # Only load the search player when it is needed
+            from pig_search import SearchComputerPlayer
+            return SearchComputerPlayer(player_name)
+
+
+class Die(object):
+    """This class is used to generate a die for a game.
+
+    Each die owns a private random generator, so dice do not share or
+    reset the global random state. Rolls are generated in bulk and
+    served from a buffer that is refilled when it runs out.
+
+    Attributes:
+        _seed (int): The seed of the die's random generator.
+        _random (Random): The die's random generator.
+        _buffer_size (int): The number of rolls generated per refill.
+        _buffer (bytes): The pre-generated rolls.
+        _position (int): The position of the next roll in the buffer.
+        _consumed (int): The number of rolls before the buffer.
+        _faces (bytes): The face each random byte maps to.
+        _rejected (bytes): The random bytes that are dropped.
+    """
+
+    # Maps random bytes to faces, by the number of faces. Bytes from
+    # the largest multiple of the number of faces up are dropped so
+    # that every face is equally likely.
+    _TABLES = {}
+
+    def __init__(self, seed=None, buffer_size=4096, faces=6):
+        """ 
+        The constructor for Die class. 
+
+        Parameters:
+            seed (int): The seed for the die's random generator. Defaults
+                        to None, which seeds from the operating system.
+            buffer_size (int): The number of rolls generated per refill.
+                               Defaults to 4096.
+            faces (int): The number of faces, from 2 to 255. Defaults
+                         to 6.
+        """
+
+        if not 2 <= faces <= 255:
+            raise ValueError("A die has between 2 and 255 faces.")
+        if faces not in Die._TABLES:
+            Die._TABLES[faces] = (bytes(byte % faces + 1 for byte in range(256)),
+                                  bytes(range(256 - 256 % faces, 256)))
+        self._faces, self._rejected = Die._TABLES[faces]
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._buffer_size = buffer_size
+        self._buffer = b""
+        self._position = 0
+        self._consumed = 0
+
+    @classmethod
+    def from_state(cls, seed, rolls, buffer_size=4096, faces=6):
+        """
+        Returns a die that has already been rolled a number of times.
+
+        The rolls are regenerated a buffer at a time without being
+        served, which costs one refill for every few thousand rolls.
+
+        Parameters:
+            seed (int): The seed for the die's random generator.
+            rolls (int): The number of rolls already made.
+            buffer_size (int): The number of rolls generated per refill.
+                               Defaults to 4096.
+            faces (int): The number of faces. Defaults to 6.
+
+        Returns:
+            (Die): The die, whose next roll is the roll after them.
+        """
+
+        die = cls(seed, buffer_size, faces)
+        while len(die._buffer) - die._position < rolls:
+            rolls -= len(die._buffer) - die._position
+            die._position = len(die._buffer)
+            die._refill()
+        die._position += rolls
+        return die
+
+    def get_state(self):
+        """
+        A method to get what is needed to recreate the die.
+
+        Returns:
+            (tuple): The die's seed and the number of rolls made.
+        """
+
+        if self._seed is None:
+            raise ValueError("Only a seeded die can be recreated.")
+        return self._seed, self._consumed + self._position
+
+    def _refill(self):
+        """The method to generate the next buffer of rolls."""
+
+        # Keep any unused rolls and append a new batch after them
+        size = self._buffer_size
+        data = self._random.getrandbits(8 * size).to_bytes(size, 'little')
+        self._consumed += self._position
+        self._buffer = self._buffer[self._position:] + data.translate(self._faces, self._rejected)
+        self._position = 0
+
+    def roll(self):
+        """ 
+        Method to 'roll' the die.
+
+        Returns:
+            (int): The result of the 'roll', an integer between 1 and 6
+        """
+
+        # Refill the buffer when it runs out
+        if self._position >= len(self._buffer):
+            self._refill()
+        # Return the next roll from the buffer
+        roll = self._buffer[self._position]
+        self._position += 1
+        return roll
+
+    def roll_many(self, k):
+        """
+        Method to 'roll' the die several times.
+
+        Parameters:
+            k (int): The number of rolls.
+
+        Returns:
+            (bytes): The results of the 'rolls', each an integer between
+                     1 and 6. Gives the same rolls as calling roll k times.
+        """
+
+        # Refill the buffer until it holds enough rolls
+        while len(self._buffer) - self._position < k:
+            self._refill()
+        rolls = self._buffer[self._position:self._position + k]
+        self._position += k
+        return rolls
+
+
+class Rules(object):
+    """This class is used to store the rules of a variant of Pig.
+
+    The rules are compiled once into tables over every outcome of a
+    roll of all the dice, so playing a roll is a lookup rather than a
+    series of checks. An outcome's code is 1 plus the faces minus 1
+    read as a number in base faces, so with one die the code is just
+    the face rolled.
+
+    Attributes:
+        _target (int): The score needed to win.
+        _dice (int): The number of dice rolled at once.
+        _faces (int): The number of faces of each die.
+        _bust_face (int): The face that ends the turn with no points.
+        _double_bust (bool): Whether or not every die showing the bust
+                             face also loses the player's total score.
+        _effects (tuple): The effect of each outcome, SCORE, BUST or
+                          BUST_ALL.
+        _points (tuple): The points of each outcome, 0 for busts.
+        _totals (tuple): The sum of the dice of each outcome.
+        _outcomes (list): The probability, effect and points of each
+                          distinct result of a roll.
+    """
+
+    # The effects of an outcome
+    SCORE = 0
+    BUST = 1
+    BUST_ALL = 2
+
+    def __init__(self, target=100, dice=1, faces=6, bust_face=1, double_bust=False):
+        """
+        The constructor for Rules class.
+
+        Parameters:
+            target (int): The score needed to win. Defaults to 100.
+            dice (int): The number of dice rolled at once. Defaults to 1.
+            faces (int): The number of faces of each die. Defaults to 6.
+            bust_face (int): The face that ends the turn with no points
+                             when any die shows it. Defaults to 1.
+            double_bust (bool): Whether or not every die showing the
+                                bust face also loses the player's total
+                                score, as in Two-Dice Pig. Defaults to
+                                False.
+        """
+
+        if target < 1 or dice < 1 or not 1 <= bust_face <= faces:
+            raise ValueError("The target and number of dice must be positive and the bust face must be a face.")
+        self._target = target
+        self._dice = dice
+        self._faces = faces
+        self._bust_face = bust_face
+        self._double_bust = double_bust
+
+        # Compile the effect and points of every outcome. Tuples are
+        # the fastest sequences to index from the game loop.
+        count = faces ** dice
+        effects, points_table, totals = [0] * (count + 1), [0] * (count + 1), [0] * (count + 1)
+        distinct = {}
+        for index in range(count):
+            rolled = [index // faces ** die % faces + 1 for die in range(dice)]
+            busts = rolled.count(bust_face)
+            if double_bust and busts == dice and dice > 1:
+                effect = self.BUST_ALL
+            elif busts:
+                effect = self.BUST
+            else:
+                effect = self.SCORE
+            points = sum(rolled) if effect == self.SCORE else 0
+            effects[index + 1] = effect
+            points_table[index + 1] = points
+            totals[index + 1] = sum(rolled)
+            distinct[effect, points] = distinct.get((effect, points), 0) + 1
+        self._effects = tuple(effects)
+        self._points = tuple(points_table)
+        self._totals = tuple(totals)
+        self._outcomes = [(outcomes / count, effect, points)
+                          for (effect, points), outcomes in sorted(distinct.items())]
+
+    def get_target(self):
+        """
+        The getter for the _target attribute.
+
+        Returns:
+            (int): The score needed to win.
+        """
+
+        return self._target
+
+    def get_dice(self):
+        """
+        The getter for the _dice attribute.
+
+        Returns:
+            (int): The number of dice rolled at once.
+        """
+
+        return self._dice
+
+    def get_faces(self):
+        """
+        The getter for the _faces attribute.
+
+        Returns:
+            (int): The number of faces of each die.
+        """
+
+        return self._faces
+
+    def get_effects(self):
+        """
+        The getter for the _effects attribute.
+
+        Returns:
+            (tuple): The effect of each outcome code.
+        """
+
+        return self._effects
+
+    def get_points(self):
+        """
+        The getter for the _points attribute.
+
+        Returns:
+            (tuple): The points of each outcome code, 0 for busts.
+        """
+
+        return self._points
+
+    def get_totals(self):
+        """
+        The getter for the _totals attribute.
+
+        Returns:
+            (tuple): The sum of the dice of each outcome code.
+        """
+
+        return self._totals
+
+    def get_outcomes(self):
+        """
+        The getter for the _outcomes attribute.
+
+        Returns:
+            (list): The probability, effect and points of each distinct
+                    result of a roll.
+        """
+
+        return self._outcomes
+
+    def get_hold_threshold(self):
+        """
+        A method to get the turn total that maximizes the expected
+        points of a turn.
+
+        Rolling again is worth it while the expected points of a roll
+        are more than the expected loss of the turn total.
+
+        Returns:
+            (int): The turn total at which to hold.
+        """
+
+        bust = sum(probability for probability, effect, _ in self._outcomes if effect != self.SCORE)
+        gain = sum(probability * points for probability, _, points in self._outcomes)
+        return math.ceil(gain / bust) if bust else self._target
+
+    def make_die(self, seed=None):
+        """
+        A method to get a die for these rules.
+
+        Parameters:
+            seed (int): The seed for the die's random generator.
+
+        Returns:
+            (Die): The die.
+        """
+
+        return Die(seed, faces=self._faces)
+
+    def roller(self, die):
+        """
+        A method to get a function rolling every die at once.
+
+        Parameters:
+            die (Die): The die to roll, from make_die.
+
+        Returns:
+            (callable): A function returning the code of the outcome
+                        of a roll of all the dice.
+        """
+
+        # With one die the face rolled is the outcome's code
+        if self._dice == 1:
+            return die.roll
+
+        faces, dice = self._faces, self._dice
+
+        def roll_dice():
+            rolls = die.roll_many(dice)
+            code = 0
+            for face in reversed(rolls):
+                code = code * faces + face - 1
+            return code + 1
+
+        return roll_dice
+
+
+# The rules of the classic game, one six-sided die to 100
+STANDARD_RULES = Rules()
+
+
+class Renderer(object):
+    """This class is the interface for showing the events of a game.
+
+    A game calls one method per event. Every method does nothing here,
+    so this class also serves as the null renderer: nothing is
+    formatted or shown at all. Subclasses override the events they
+    show.
+    """
+
+    def game_started(self, players, seed):
+        """
+        The method called before the first turn of a game.
+
+        Parameters:
+            players (tuple): The game's players, in turn order.
+            seed (int): The seed of the game's die.
+        """
+
+    def turn_started(self, player):
+        """
+        The method called when a player's turn starts.
+
+        Parameters:
+            player (Player): The player who's turn it is.
+        """
+
+    def rolled(self, player, roll):
+        """
+        The method called when a player rolls and may roll again.
+
+        Parameters:
+            player (Player): The player who rolled.
+            roll (int): The roll.
+        """
+
+    def busted(self, player, roll):
+        """
+        The method called when a player rolls a 1 and loses the turn.
+
+        Parameters:
+            player (Player): The player who rolled.
+            roll (int): The roll.
+        """
+
+    def reached_target(self, player, roll):
+        """
+        The method called when a player's roll wins the game.
+
+        Parameters:
+            player (Player): The player who rolled.
+            roll (int): The roll.
+        """
+
+    def held(self, player):
+        """
+        The method called when a player holds, after their turn score
+        is added to their total score.
+
+        Parameters:
+            player (Player): The player who held.
+        """
+
+    def invalid_action(self, player, action):
+        """
+        The method called when a player enters an invalid action.
+
+        Parameters:
+            player (Player): The player.
+            action (str): The action that was entered.
+        """
+
+    def time_left(self, seconds):
+        """
+        The method called before a player in a timed game acts.
+
+        Parameters:
+            seconds (float): The number of seconds left in the game.
+        """
+
+    def winner(self, players):
+        """
+        The method called when a player reaches the target.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+    def timed_winner(self, players):
+        """
+        The method called when the time of a timed game runs out.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+    def leaderboard(self, players):
+        """
+        The method called at the end of the game.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+
+# The null renderer shows nothing
+NullRenderer = Renderer
+
+
+class TextRenderer(Renderer):
+    """This class is used to show a game as text, one line at a time.
+
+    Attributes:
+        _output (callable): The function each line is sent to.
+    """
+
+    def __init__(self, output=print):
+        """
+        The constructor for TextRenderer class.
+
+        Parameters:
+            output (callable): The function each line is sent to.
+                               Defaults to print.
+        """
+
+        self._output = output
+
+    def turn_started(self, player):
+        """
+        Let the players know who's turn it is.
+
+        Parameters:
+            player (Player): The player who's turn it is.
+        """
+
+        self._output("\n{}, it's your turn. Your current score is {}".format(
+            player.get_name(), player.get_total_score()))
+
+    def rolled(self, player, roll):
+        """
+        Show a roll that adds to the turn score.
+
+        Parameters:
+            player (Player): The player who rolled.
+            roll (int): The roll.
+        """
+
+        self._output("Nice {}! You rolled a {}. Your current score for this turn is {}. Your total score is {}".format(
+                player.get_name(),
+                roll,
+                player.get_current_score(),
+                player.get_current_score() + player.get_total_score()
+            )
+        )
+
+    def busted(self, player, roll):
+        """
+        Show a roll of 1.
+
+        Parameters:
+            player (Player): The player who rolled.
+            roll (int): The roll.
+        """
+
+        self._output("Ouch {}, you rolled a {} and lost all points you accumulated during this turn. Your score for this turn is {}. Your total score is {}.".format(
+            player.get_name(), roll, player.get_current_score(), player.get_total_score()))
+
+    def held(self, player):
+        """
+        Show a hold.
+
+        Parameters:
+            player (Player): The player who held.
+        """
+
+        self._output("{}, you held. Your score for this turn is {}. Your total score is {}.".format(
+            player.get_name(), player.get_current_score(), player.get_total_score()))
+
+    def invalid_action(self, player, action):
+        """
+        Show that an invalid action was entered.
+
+        Parameters:
+            player (Player): The player.
+            action (str): The action that was entered.
+        """
+
+        self._output("You entered an invalid action.")
+
+    def time_left(self, seconds):
+        """
+        Show the time left in the game.
+
+        Parameters:
+            seconds (float): The number of seconds left in the game.
+        """
+
+        self._output("There are {} seconds left in this game.".format(round(seconds, 0)))
+
+    def winner(self, players):
+        """
+        Announce the winner.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+        winner = sorted(((player.get_name(), player.get_last_roll(), player.get_total_score())
+                       for player in players),
+                             key=lambda player: (player[1]),
+                             reverse=True)[0]
+
+        self._output("\n\nCongratulations {}, you rolled a {} and your total score is {}. You won the game!"
+                              .format(winner[0], winner[1], winner[2]))
+
+    def timed_winner(self, players):
+        """
+        Announce the winner of a timed game.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+        winner = sorted(((player.get_name(), player.get_last_roll(), player.get_total_score())
+                       for player in players),
+                             key=lambda player: (player[1]),
+                             reverse=True)[0]
+
+        self._output("\n\nCongratulations {}, you had the highest score of {} before time ran out. You won the game!"
+                              .format(winner[0], winner[2]))
+
+    def leaderboard(self, players):
+        """
+        Show a leaderboard with the scores and number of rolls for
+        each of the game's players.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+        # Get the players and create the leaderboard tuple
+        leaderboard = ((player.get_name(), player.get_total_score(), player.get_total_rolls())
+                       for player in players)
+
+        self._output("\nLEADERBOARD\n")
+        # Print leaderboard header border
+        self._output("+-{:<32}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10))
+        # Print the leaderboard header
+        self._output("| {:<32} | {:>10} | {:>10} |".format(
+            'Player', 'Score', '# of Rolls'))
+        # Sort by highest scores first and print the details
+        for player in sorted(leaderboard,
+                             key=lambda player: (player[1]),
+                             reverse=True):
+            # Print the cell separators
+            self._output("|-{:<32}-+-{:>10}-+-{:>10}-|".format("-"*32, "-"*10, "-"*10))
+            # Print the player's details
+            self._output("| {:<32} | {:>10} | {:>10} |".format(
+                player[0], player[1], player[2]))
+
+        # Print leaderboard footer border
+        self._output("+-{:<32}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10))
+
+
+class BufferedRenderer(TextRenderer):
+    """This class is used to show a game as text in a single write.
+
+    The lines of a game are collected and written to the stream as one
+    block once the leaderboard has been added.
+
+    Attributes:
+        _output (callable): The function each line is sent to.
+        _lines (list): The lines of the current game.
+        _stream (file): The stream the game is written to.
+    """
+
+    def __init__(self, stream=None):
+        """
+        The constructor for BufferedRenderer class.
+
+        Parameters:
+            stream (file): The stream the game is written to. Defaults
+                           to None, which writes to sys.stdout.
+        """
+
+        self._lines = []
+        self._stream = stream
+        super().__init__(self._lines.append)
+
+    def leaderboard(self, players):
+        """
+        Add the leaderboard and write the game.
+
+        Parameters:
+            players (tuple): The game's players.
+        """
+
+        super().leaderboard(players)
+        self.flush()
+
+    def flush(self):
+        """The method to write the collected lines and clear them."""
+
+        if self._lines:
+            (self._stream or sys.stdout).write("\n".join(self._lines) + "\n")
+            self._lines.clear()
+
+
+class EventRenderer(Renderer):
+    """This class is used to emit a game's events as JSON lines.
+
+    Each event is a JSON object with an "event" field and the details
+    of the event, for other programs to read.
+
+    Attributes:
+        _output (callable): The function each line is sent to.
+        _dumps (callable): The function encoding an event as JSON.
+    """
+
+    def __init__(self, output=print):
+        """
+        The constructor for EventRenderer class.
+
+        Parameters:
+            output (callable): The function each line is sent to.
+                               Defaults to print.
+        """
+
+        import json
+
+        self._output = output
+        self._dumps = json.dumps
+
+    def _emit(self, event, **details):
+        """
+        The method to send an event.
+
+        Parameters:
+            event (str): The name of the event.
+            details (dict): The details of the event.
+        """
+
+        self._output(self._dumps(dict(event=event, **details), separators=(",", ":")))
+
+    def _player_event(self, event, player, **details):
+        """
+        The method to send an event about a player.
+
+        Parameters:
+            event (str): The name of the event.
+            player (Player): The player.
+            details (dict): The other details of the event.
+        """
+
+        self._emit(event, player=player.get_name(), turn_score=player.get_current_score(),
+                   total_score=player.get_total_score(), **details)
+
+    def game_started(self, players, seed):
+        """Emit a "game" event with the seed and the players in turn order."""
+
+        self._emit("game", seed=seed, players=[player.get_name() for player in players])
+
+    def turn_started(self, player):
+        """Emit a "turn" event."""
+
+        self._player_event("turn", player)
+
+    def rolled(self, player, roll):
+        """Emit a "roll" event."""
+
+        self._player_event("roll", player, roll=roll)
+
+    def busted(self, player, roll):
+        """Emit a "bust" event."""
+
+        self._player_event("bust", player, roll=roll)
+
+    def reached_target(self, player, roll):
+        """Emit a "win" event."""
+
+        self._player_event("win", player, roll=roll)
+
+    def held(self, player):
+        """Emit a "hold" event."""
+
+        self._player_event("hold", player)
+
+    def invalid_action(self, player, action):
+        """Emit an "invalid" event."""
+
+        self._player_event("invalid", player, action=action)
+
+    def time_left(self, seconds):
+        """Emit a "clock" event."""
+
+        self._emit("clock", seconds_left=round(seconds, 3))
+
+    def leaderboard(self, players):
+        """Emit a "game_over" event with every player's results."""
+
+        self._emit("game_over", players=[
+            {"player": player.get_name(), "score": player.get_total_score(),
+             "rolls": player.get_total_rolls()}
+            for player in players])
+
+
+class GameState(object):
+    """This class is used to store a game at one moment.
+
+    A GameState is a value: it is never changed after it is made, so
+    it can be kept, compared and shared freely. It holds the die's seed
+    and the number of rolls made instead of the die's generator, so it
+    serializes to a few bytes per player.
+
+    Attributes:
+        _seed (int): The seed of the game's die.
+        _rolls (int): The number of times the die has been rolled.
+        _seat (int): The seat of the current player.
+        _active_turn (bool): Whether or not the current player's turn
+                             continues.
+        _end_game (bool): Whether or not the game has ended.
+        _players (tuple): The total score, current score, number of
+                          rolls and last roll of each seat.
+        _time_left (float): The seconds left in a timed game, or None.
+    """
+
+    __slots__ = ('_seed', '_rolls', '_seat', '_active_turn', '_end_game', '_players',
+                 '_time_left')
+
+    # Flags, number of players, seat, seed length and die rolls,
+    # followed by the seed, the time left of a timed game and each
+    # player's scores and rolls
+    _HEADER = struct.Struct("<BBBBI")
+    _TIME = struct.Struct("<d")
+    _PLAYER = struct.Struct("<HHIB")
+
+    def __init__(self, seed, rolls, seat, active_turn, end_game, players, time_left=None):
+        """
+        The constructor for GameState class.
+
+        Parameters:
+            seed (int): The seed of the game's die.
+            rolls (int): The number of times the die has been rolled.
+            seat (int): The seat of the current player.
+            active_turn (bool): Whether or not the current player's
+                                turn continues.
+            end_game (bool): Whether or not the game has ended.
+            players (sequence): The total score, current score, number
+                                of rolls and last roll of each seat.
+            time_left (float): The seconds left in a timed game.
+                               Defaults to None, for untimed games.
+        """
+
+        self._seed = seed
+        self._rolls = rolls
+        self._seat = seat
+        self._active_turn = active_turn
+        self._end_game = end_game
+        self._players = tuple(tuple(player) for player in players)
+        self._time_left = time_left
+
+    def __eq__(self, other):
+        return isinstance(other, GameState) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return "GameState(seed={}, rolls={}, seat={}, active_turn={}, end_game={}, players={}, time_left={})".format(
+            *self._key())
+
+    def _key(self):
+        """
+        Returns:
+            (tuple): Every attribute of the state.
+        """
+
+        return (self._seed, self._rolls, self._seat, self._active_turn, self._end_game,
+                self._players, self._time_left)
+
+    def get_seed(self):
+        """
+        The getter for the _seed attribute.
+
+        Returns:
+            (int): The seed of the game's die.
+        """
+
+        return self._seed
+
+    def get_rolls(self):
+        """
+        The getter for the _rolls attribute.
+
+        Returns:
+            (int): The number of times the die has been rolled.
+        """
+
+        return self._rolls
+
+    def get_seat(self):
+        """
+        The getter for the _seat attribute.
+
+        Returns:
+            (int): The seat of the current player.
+        """
+
+        return self._seat
+
+    def is_active_turn(self):
+        """
+        The getter for the _active_turn attribute.
+
+        Returns:
+            (bool): Whether or not the current player's turn continues.
+        """
+
+        return self._active_turn
+
+    def is_end_game(self):
+        """
+        The getter for the _end_game attribute.
+
+        Returns:
+            (bool): Whether or not the game has ended.
+        """
+
+        return self._end_game
+
+    def get_players(self):
+        """
+        The getter for the _players attribute.
+
+        Returns:
+            (tuple): The total score, current score, number of rolls
+                     and last roll of each seat.
+        """
+
+        return self._players
+
+    def get_time_left(self):
+        """
+        The getter for the _time_left attribute.
+
+        Returns:
+            (float): The seconds left in a timed game, or None.
+        """
+
+        return self._time_left
+
+    def get_seat_to_move(self):
+        """
+        A method to get the seat of the player who acts next.
+
+        Returns:
+            (int): The seat that acts next.
+        """
+
+        if self._active_turn:
+            return self._seat
+        return (self._seat + 1) % len(self._players)
+
+    def after_roll(self, outcome, rules=STANDARD_RULES):
+        """
+        A method to get the state after the player to move rolls.
+
+        Parameters:
+            outcome (int): The outcome code of the roll, which is the
+                           face rolled with one die.
+            rules (Rules): The rules of the game. Defaults to the
+                           standard rules.
+
+        Returns:
+            (GameState): The state after the roll.
+        """
+
+        if self._end_game:
+            raise ValueError("The game has ended.")
+        seat = self.get_seat_to_move()
+        total, current, rolls, _ = self._players[seat]
+        active_turn, end_game = True, False
+        effect = rules._effects[outcome]
+        points = rules._points[outcome]
+        # A bust ends the turn with no points, and reaching the target
+        # ends the game
+        if effect != Rules.SCORE:
+            current, active_turn = 0, False
+            if effect == Rules.BUST_ALL:
+                total = 0
+        elif total + current + points >= rules._target:
+            total, current = total + current + points, 0
+            active_turn, end_game = False, True
+        else:
+            current += points
+        return self._with_player(seat, (total, current, rolls + 1, rules._totals[outcome]),
+                                 active_turn, end_game, self._rolls + rules._dice)
+
+    def after_hold(self):
+        """
+        A method to get the state after the player to move holds.
+
+        Returns:
+            (GameState): The state after the hold.
+        """
+
+        if self._end_game:
+            raise ValueError("The game has ended.")
+        seat = self.get_seat_to_move()
+        total, current, rolls, last_roll = self._players[seat]
+        return self._with_player(seat, (total + current, 0, rolls, last_roll), False, False,
+                                 self._rolls)
+
+    def _with_player(self, seat, player, active_turn, end_game, rolls):
+        """
+        Returns a copy of the state with one player changed.
+
+        Parameters:
+            seat (int): The seat of the player.
+            player (tuple): The player's new scores and rolls.
+            active_turn (bool): Whether or not the player's turn continues.
+            end_game (bool): Whether or not the game has ended.
+            rolls (int): The number of times the die has been rolled.
+
+        Returns:
+            (GameState): The new state.
+        """
+
+        players = self._players[:seat] + (player,) + self._players[seat + 1:]
+        return GameState(self._seed, rolls, seat, active_turn, end_game, players, self._time_left)
+
+    def to_bytes(self):
+        """
+        A method to serialize the state.
+
+        Returns:
+            (bytes): The serialized state.
+        """
+
+        if self._seed < 0:
+            raise ValueError("Only states with non-negative seeds can be serialized.")
+        seed = self._seed.to_bytes((self._seed.bit_length() + 7) // 8, 'little')
+        flags = self._active_turn | self._end_game << 1 | (self._time_left is not None) << 2
+        parts = [self._HEADER.pack(flags, len(self._players), self._seat, len(seed), self._rolls),
+                 seed]
+        if self._time_left is not None:
+            parts.append(self._TIME.pack(self._time_left))
+        parts.extend(self._PLAYER.pack(*player) for player in self._players)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Returns the state serialized by to_bytes.
+
+        Parameters:
+            data (bytes): The serialized state.
+
+        Returns:
+            (GameState): The state.
+        """
+
+        flags, n_players, seat, seed_length, rolls = cls._HEADER.unpack_from(data)
+        offset = cls._HEADER.size
+        seed = int.from_bytes(data[offset:offset + seed_length], 'little')
+        offset += seed_length
+        time_left = None
+        if flags & 4:
+            (time_left,) = cls._TIME.unpack_from(data, offset)
+            offset += cls._TIME.size
+        players = [cls._PLAYER.unpack_from(data, offset + index * cls._PLAYER.size)
+                   for index in range(n_players)]
+        return cls(seed, rolls, seat, bool(flags & 1), bool(flags & 2), players, time_left)
+
+
+class Game(object):
+    """This class is used to run a game of Pig.
+
+    The attributes of this class are protected as they should not
+    be accessed or set directly. Additionally, most functions of
+    this class are protected to prevent manipulation of the game.
+    This is ensures the integrity of the game.
+
+    Attributes:
+        _players (Players): The instantiated players for this game.
+        _die (Die): The die instantiated for this game.
+        _active_turn (bool): Whether or not the game is in active turn.
+        _end_game (bool): Whether or not the game has ended.
+        _next_player (bool): Whether or not the next turn goes to the
+                             next player.
+        _renderer (Renderer): The renderer showing the game's events.
+        _seed (int): The seed of the game's die.
+        _metrics (GameMetrics): The metrics the game reports to, or None.
+        _rules (Rules): The rules of the game.
+        _roll (callable): The function rolling the game's dice.
+    """
+
+    def __init__(self, players, seed=None, renderer=None, metrics=None, rules=None):
+        """ 
+        The constructor for Game class.
+
+        Instantiates the players and die for the current game.
+
+        Parameters: 
+            players (sequence): The players for the current game, in
+                                turn order.
+            seed (int): The seed for the game's die. Defaults to None,
+                        which picks a random seed.
+            renderer (Renderer): The renderer showing the game's
+                                 events. Defaults to None, which
+                                 prints them as text.
+            metrics (GameMetrics): The metrics to count the game's
+                                   turns, actions and decision times
+                                   in. Defaults to None, which counts
+                                   nothing.
+            rules (Rules): The rules of the game. Defaults to None,
+                           which plays the standard rules.
+        """
+
+        # Instantiate a Players object with the players
+        self._players = Players(players)
+        # Instantiate the Die to be used for the current game. A random
+        # seed is picked here so that every game can be replayed.
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'little')
+        self._seed = seed
+        self._rules = rules if rules is not None else STANDARD_RULES
+        self._die = self._rules.make_die(seed)
+        self._roll = self._rules.roller(self._die)
+        # Track the game status
+        self._active_turn = True
+        self._end_game = False
+        self._next_player = False
+        self._renderer = renderer if renderer is not None else TextRenderer()
+        self._metrics = metrics
+
+    def get_seed(self):
+        """ 
+        The getter for the _seed attribute.
+
+        Returns:
+            (int): The seed of the game's die.
+        """
+
+        return self._seed
+
+    def snapshot(self):
+        """
+        The method to capture the current game's state.
+
+        The state is only consistent between actions, i.e. between
+        steps or while a player is being asked for an action, not
+        from inside a renderer.
+
+        Returns:
+            (GameState): The state of the game.
+        """
+
+        seed, rolls = self._die.get_state()
+        return GameState(seed, rolls, self._players.get_index(), self._active_turn,
+                         self._end_game,
+                         [player.get_state() for player in self._players.get_seats()],
+                         self._saved_time_left())
+
+    def restore(self, state):
+        """
+        The method to put the current game into a captured state.
+
+        The game's players take the scores and rolls of the state's
+        seats, and the die continues from the state's next roll. The
+        next step starts, or carries on, the turn of the player to move
+        and lets the renderer know the game's players again, so a game
+        can be resumed by a new process. A finished game is restored
+        as it ended, with its last player in turn.
+
+        Parameters:
+            state (GameState): The state, from the snapshot of a game
+                               with the same number of players.
+        """
+
+        seats = self._players.get_seats()
+        if len(state.get_players()) != len(seats):
+            raise ValueError("The state is for {} players, not {}.".format(
+                len(state.get_players()), len(seats)))
+
+        self._seed = state.get_seed()
+        self._die = Die.from_state(state.get_seed(), state.get_rolls(),
+                                   faces=self._rules.get_faces())
+        self._roll = self._rules.roller(self._die)
+        for player, player_state in zip(seats, state.get_players()):
+            player.set_state(player_state)
+        self._end_game = state.is_end_game()
+        if self._end_game:
+            # A finished game stays with the player who ended it
+            self._players.set_index(state.get_seat())
+            self._active_turn = False
+        else:
+            self._players.set_index(state.get_seat_to_move())
+            self._active_turn = True
+        self._next_player = False
+        self._restore_time_left(state.get_time_left())
+
+    def _saved_time_left(self):
+        """
+        The method to get the time left for a snapshot.
+
+        Returns:
+            (float): None, as the game is not timed.
+        """
+
+        return None
+
+    def _restore_time_left(self, time_left):
+        """
+        The method to restore the time left from a snapshot.
+
+        Parameters:
+            time_left (float): Ignored, as the game is not timed.
+        """
+
+    def start(self):
+        """The method to start the current game."""
+
+        # Play turns until the game is over
+        self.run_until_done()
+
+    def step(self):
+        """
+        The method to play a single turn of the current game.
+
+        Returns:
+            (bool): Whether or not the game continues after this turn.
+        """
+
+        # Nothing left to play once the game has ended
+        if self._end_game:
+            return False
+
+        # Only the first turn stays with the current player
+        self._turn(self._next_player)
+        self._next_player = True
+        return not self._end_game
+
+    def run_until_done(self):
+        """
+        The method to play turns until the current game is over.
+
+        Turns are played one after another in a loop, so the stack
+        does not grow with the length of the game.
+        """
+
+        while self.step():
+            pass
+
+    async def step_async(self):
+        """
+        The method to play a single turn of the current game from
+        a coroutine.
+
+        Players whose request_action returns an awaitable, such as
+        remote players, are awaited. Other players are played inline.
+
+        Returns:
+            (bool): Whether or not the game continues after this turn.
+        """
+
+        # Nothing left to play once the game has ended
+        if self._end_game:
+            return False
+
+        # Only the first turn stays with the current player
+        player = self._begin_turn(self._next_player)
+        self._next_player = True
+
+        while self._turn_continues():
+            self._prompt(player)
+            start = time.perf_counter() if self._metrics is not None else None
+            action = self._request_action(player)
+            if hasattr(action, "__await__"):
+                action = await action
+            if start is None:
+                self._apply_action(player, action)
+            else:
+                self._measure_action(player, action, start)
+
+        self._end_turn()
+        return not self._end_game
+
+    async def run_async(self):
+        """The method to play turns until the current game is over from a coroutine."""
+
+        while await self.step_async():
+            pass
+
+    def _accounce_winner(self):
+        """The method to announce the winner."""
+
+        self._renderer.winner(self._players.get_players())
+
+    def _game_over(self):
+        """
+            The method to run at the end of the current game.
+
+            Shows a leaderboard with the scores and number of
+            rolls for each of the current game's players.
+        """
+
+        self._renderer.leaderboard(self._players.get_players())
+
+    def _prompt(self, player):
+        """
+        The method to run before a player is asked for an action.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+        """
+
+    def _play(self, player):
+        """
+        The method to control a player's turn.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+        """
+
+        self._prompt(player)
+        # Request the current player's desired action, timing the
+        # decision only when the game has metrics
+        if self._metrics is None:
+            self._apply_action(player, self._request_action(player))
+        else:
+            start = time.perf_counter()
+            self._measure_action(player, self._request_action(player), start)
+
+    def _measure_action(self, player, action, start):
+        """
+        The method to record a player's decision time and carry out
+        their action.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+            action (str): The player's action.
+            start (float): The performance counter time the player was
+                           asked for the action.
+        """
+
+        self._metrics.record_decision(player, time.perf_counter() - start)
+        effect = self._apply_action(player, action)
+        self._metrics.record_action(player, action, self._end_game, effect)
+
+    def _request_action(self, player):
+        """
+        The method to ask a player for their action.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+
+        Returns:
+            (str): The player's action, or an awaitable of it.
+        """
+
+        return player.request_action()
+
+    def _apply_action(self, player, action):
+        """
+        The method to carry out a player's action.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+            action (str): The player's action.
+
+        Returns:
+            (int): The effect of the roll, one of the Rules constants,
+                   or None if the player did not roll.
+        """
+
+        # Player chose to roll
+        if action == "r":
+            # Roll the dice and look up the outcome in the rules'
+            # tables, then add to roll total for the turn
+            rules = self._rules
+            outcome = self._roll()
+            roll = rules._totals[outcome]
+            player.update_total_rolls()
+            player.update_last_roll(roll)
+            effect = rules._effects[outcome]
+            # If the player busts, reset the current
+            # score and commit the current rolls count
+            # to the player's Player object, and exit
+            # the loop.
+            if effect:
+                player.reset_turn_stats()
+                # Some variants also take away the player's total score
+                if effect == Rules.BUST_ALL:
+                    player.set_state((0,) + player.get_state()[1:])
+                player.commit_score()
+                self._renderer.busted(player, roll)
+                self._active_turn = False
+            # If the player scored, update the current score
+            # by the roll's points, check to see if the
+            # player's total reached the target and end
+            # the game, otherwise ask the player for their
+            # next action
+            else:
+                player.update_turn_score(rules._points[outcome])
+                if (player.get_current_score() + player.get_total_score()) >= rules._target:
+                    player.commit_score()
+                    player.reset_turn_stats()
+                    self._renderer.reached_target(player, roll)
+                    self._end_game, self._active_turn = True, False
+                else:
+                    self._renderer.rolled(player, roll)
+            return effect
+        # Player chose to hold, commit their current score and
+        # roll count to their Player object and exit the loop
+        elif action == "h":
+            player.commit_score()
+            self._renderer.held(player)
+            player.reset_turn_stats()
+            self._active_turn = False
+        # The player entered an invalid action
+        else:
+            self._renderer.invalid_action(player, action)
+
+    def _begin_turn(self, next_player):
+        """
+        The method to start a player's turn.
+
+        Parameters: 
+            next_player (bool): Used to decide if the next player
+                                should be called to play.
+
+        Returns:
+            (Player): The player who's turn it is.
+        """
+
+        # Get the player for the current turn
+        if not next_player:
+            self._renderer.game_started(self._players.get_seats(), self._seed)
+        player = self._players.get_current_player(
+        ) if not next_player else self._players.get_next_player()
+
+        # Reset the _active_turn attribute to True
+        self._active_turn = True
+        if self._metrics is not None:
+            self._metrics.record_turn()
 
         # Let the players know who's turn it is
-        print("\n{}, it's your turn. Your current score is {}".format(
-            player.get_name(), player.get_total_score()))
+        self._renderer.turn_started(player)
+
+        return player
+
+    def _turn_continues(self):
+        """
+        The method to check whether the current turn continues.
+
+        Returns:
+            (bool): Whether or not the current player acts again.
+        """
+
+        # Keep the current player's turn until they roll a 1,
+        # win the game, or hold.
+        return self._active_turn and not self._end_game
+
+    def _end_turn(self):
+        """
+        The method to finish a player's turn.
+
+        Checks to see if the game is over and, if so, calls the protected
+        _game_over function to trigger the leaderboard display. The next
+        turn is started by the step method.
+        """
+
+        if self._end_game:
+            if self._metrics is not None:
+                self._metrics.record_game()
+            self._accounce_winner()
+            self._game_over()
+
+    def _turn(self, next_player=False):
+        """
+        The method to control player turns.
+
+        Parameters: 
+            next_player (bool): Used to decide if the next player
+                                should be called to play. Defaults
+                                to False.
+        """
+
+        player = self._begin_turn(next_player)
+
+        while self._turn_continues():
+            self._play(player)
+
+        self._end_turn()
+
+
+class TimedGame(Game):
+    """This class is used to run a timed game of Pig.
+
+    Inherits from the Game class. The clock is the monotonic clock and
+    players are only given the time that is left to answer, so a game
+    never runs past its duration.
+
+    Attributes:
+        _players (Players): The instantiated players for this game.
+        _die (Die): The die instantiated for this game.
+        _active_turn (bool): Whether or not the game is in active turn.
+        _end_game (bool): Whether or not the game has ended.
+        _next_player (bool): Whether or not the next turn goes to the
+                             next player.
+        _renderer (Renderer): The renderer showing the game's events.
+        _seed (int): The seed of the game's die.
+        _metrics (GameMetrics): The metrics the game reports to, or None.
+        _rules (Rules): The rules of the game.
+        _roll (callable): The function rolling the game's dice.
+        _duration (float): The length of the game in seconds.
+        _end_time (float): The monotonic time the game ends.
+    """
+
+    def __init__(self, players, seed=None, renderer=None, duration=60, metrics=None, rules=None):
+        """
+        The constructor for TimedGame class.
+
+        Parameters:
+            players (sequence): The players for the current game, in
+                                turn order.
+            seed (int): The seed for the game's die. Defaults to None,
+                        which picks a random seed.
+            renderer (Renderer): The renderer showing the game's
+                                 events. Defaults to None, which
+                                 prints them as text.
+            duration (float): The length of the game in seconds.
+                              Defaults to 60.
+            metrics (GameMetrics): The metrics to count the game's
+                                   turns, actions and decision times
+                                   in. Defaults to None, which counts
+                                   nothing.
+            rules (Rules): The rules of the game. Defaults to None,
+                           which plays the standard rules.
+        """
+
+        super().__init__(players, seed, renderer, metrics, rules)
+        self._duration = duration
+        # The clock starts with the first turn
+        self._end_time = None
+
+    def _time_left(self):
+        """
+        The method to get the time left in the game.
+
+        Returns:
+            (float): The number of seconds left, at least 0.
+        """
+
+        return max(self._end_time - time.monotonic(), 0.0)
+
+    def _saved_time_left(self):
+        """
+        The method to get the time left for a snapshot.
+
+        Returns:
+            (float): The seconds left, or the whole duration if the
+                     clock has not started.
+        """
+
+        return self._duration if self._end_time is None else self._time_left()
+
+    def _restore_time_left(self, time_left):
+        """
+        The method to restore the time left from a snapshot.
+
+        Parameters:
+            time_left (float): The seconds left, or None to start the
+                               clock with the next turn.
+        """
+
+        self._end_time = None if time_left is None else time.monotonic() + time_left
+
+    def _accounce_winner(self):
+        """The method to announce the winner."""
+        
+        if self._time_left() <= 0:
+            self._renderer.timed_winner(self._players.get_players())
+        else:
+            super()._accounce_winner()
+
+    def _begin_turn(self, next_player):
+        """
+        The method to start a player's turn.
+
+        Starts the clock on the first turn.
+
+        Parameters: 
+            next_player (bool): Used to decide if the next player
+                                should be called to play.
+
+        Returns:
+            (Player): The player who's turn it is.
+        """
+
+        if self._end_time is None:
+            self._end_time = time.monotonic() + self._duration
+        return super()._begin_turn(next_player)
+
+    def _prompt(self, player):
+        """
+        The method to run before a player is asked for an action.
+        
+        Shows the time left in the game.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+        """
+
+        self._renderer.time_left(self._time_left())
+
+    def _request_action(self, player):
+        """
+        The method to ask a player for their action.
+
+        The player is only given the time left in the game.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+
+        Returns:
+            (str): The player's action, None if the time ran out, or
+                   an awaitable of either.
+        """
+
+        return player.request_action(timeout=self._time_left())
+
+    def _apply_action(self, player, action):
+        """
+        The method to carry out a player's action.
+
+        Ends the game if the player ran out of time.
+
+        Parameters: 
+            player (Player): The player who's turn it is.
+            action (str): The player's action.
+
+        Returns:
+            (int): The effect of the roll, one of the Rules constants,
+                   or None if the player did not roll.
+        """
+
+        if action is None:
+            self._end_game, self._active_turn = True, False
+            return None
+        return super()._apply_action(player, action)
+
+    def _turn_continues(self):
+        """
+        The method to check whether the current turn continues.
+
+        Returns:
+            (bool): Whether or not the current player acts again.
+        """
 
         # Keep the current player's turn until they roll a 1,
         # win the game, hold, or the time has expired
-        while self._active_turn and not self._end_game and time.time() < self._end_time:
-            self._play(player, round(self._end_time - time.time(), 0))
+        return super()._turn_continues() and self._time_left() > 0
+
+    def _end_turn(self):
+        """
+        The method to finish a player's turn.
 
-        if time.time() >= self._end_time:
+        Ends the game if the time has expired.
+        """
+
+        if self._time_left() <= 0:
             self._end_game = True
             self._active_turn = False
 
-        # Check to see if the game is over, if not go to the next player,
-        # otherwise call the protected _game_over function to trigger the
-        # leaderboard display
-        if not self._end_game:
-            self._turn(True)
-        else:
-            self._accounce_winner()
-            self._game_over()
+        super()._end_turn()
 
 
 class TimedGameProxy(Game):
@@ -566,76 +2437,386 @@ class TimedGameProxy(Game):
         The constructor for TimedGameProxy class.
 
         Parameters: 
-            players (Queue): The players queue for the current game.
+            players (sequence): The players for the current game, in
+                                turn order.
         """
 
         self._players = players
         self._game = None
 
-    def start(self, timed):
+    def start(self, timed, duration=60, metrics=None):
         """
         The method to start the game.
 
         Parameters:
             timed (bool): Whether or not the game is timed.
+            duration (float): The length of a timed game in seconds.
+                              Defaults to 60.
+            metrics (GameMetrics): The metrics the game reports to.
+                                   Defaults to None.
         """
 
         if timed:
-            self._game = TimedGame(self._players)
+            self._game = TimedGame(self._players, duration=duration, metrics=metrics)
         else:
-            self._game = Game(self._players)
+            self._game = Game(self._players, metrics=metrics)
        
         self._game.start()
 
 
+class SimulationResult(object):
+    """This class is used to store the results of a headless simulation.
+
+    The per-game results are stored in flat, compact arrays rather
+    than as Player objects so that large simulations stay small in
+    memory. Scores and rolls are laid out game by game, one entry per
+    seat, i.e. the entry for a seat in a game is at
+    ``game * n_players + seat``.
+
+    Attributes:
+        _n_players (int): The number of players in each game.
+        _winners (array): The winning seat of each game.
+        _scores (array): The total score of each seat in each game.
+        _rolls (array): The number of rolls of each seat in each game.
+    """
+
+    def __init__(self, n_players, winners, scores, rolls):
+        """
+        The constructor for SimulationResult class.
+
+        Parameters:
+            n_players (int): The number of players in each game.
+            winners (array): The winning seat of each game.
+            scores (array): The total score of each seat in each game.
+            rolls (array): The number of rolls of each seat in each game.
+        """
+
+        self._n_players = n_players
+        self._winners = winners
+        self._scores = scores
+        self._rolls = rolls
+
+    def __len__(self):
+        """
+        Returns:
+            (int): The number of simulated games.
+        """
+
+        return len(self._winners)
+
+    def get_n_players(self):
+        """
+        The getter for the _n_players attribute.
+
+        Returns:
+            (int): The number of players in each game.
+        """
+
+        return self._n_players
+
+    def get_winners(self):
+        """
+        The getter for the _winners attribute.
+
+        Returns:
+            (array): The winning seat of each game.
+        """
+
+        return self._winners
+
+    def get_scores(self):
+        """
+        The getter for the _scores attribute.
+
+        Returns:
+            (array): The total score of each seat in each game.
+        """
+
+        return self._scores
+
+    def get_rolls(self):
+        """
+        The getter for the _rolls attribute.
+
+        Returns:
+            (array): The number of rolls of each seat in each game.
+        """
+
+        return self._rolls
+
+    def get_game(self, game):
+        """
+        A method to get the result of a single game.
+
+        Parameters:
+            game (int): The index of the game.
+
+        Returns:
+            (tuple): The winning seat, the scores and the rolls of the game.
+        """
+
+        start = game * self._n_players
+        end = start + self._n_players
+        return (self._winners[game],
+                tuple(self._scores[start:end]),
+                tuple(self._rolls[start:end]))
+
+    def get_win_counts(self):
+        """
+        A method to count the number of wins for each seat.
+
+        Returns:
+            (list): The number of games won by each seat.
+        """
+
+        counts = [0] * self._n_players
+        for winner in self._winners:
+            counts[winner] += 1
+        return counts
+
+
+def simulate(n_games, strategies=None, seed=0, rules=None):
+    """
+    Plays games of Pig without any output or input.
+
+    The rules are the same as in Game, but the turns are played in a
+    flat loop and nothing is printed, which makes it suitable for
+    evaluating computer players over many games.
+
+    Parameters:
+        n_games (int): The number of games to play.
+        strategies (sequence): The player class for each seat, in
+                               turn order. Defaults to None, which
+                               plays two ComputerPlayers following the
+                               rules.
+        seed (int): The seed for the games' die.
+        rules (Rules): The rules of the games. Defaults to None, which
+                       plays the standard rules.
+
+    Returns:
+        (SimulationResult): The results of the games.
+    """
+
+    rules = rules if rules is not None else STANDARD_RULES
+    if strategies is None:
+        strategies = (partial(ComputerPlayer, rules=rules),) * 2
+    n_players = len(strategies)
+    if n_players < 1:
+        raise ValueError("At least one strategy is required.")
+
+    # Use a private die so the global random state is untouched, and
+    # look every roll up in the rules' tables
+    roll_dice = rules.roller(rules.make_die(seed))
+    effects, points, totals, target = rules._effects, rules._points, rules._totals, rules._target
+    winners = array('B', bytes(n_games))
+    scores = array('H', bytes(2 * n_games * n_players))
+    rolls = array('L', [0]) * (n_games * n_players)
+
+    for game in range(n_games):
+        players = [strategy("Player {}".format(seat + 1))
+                   for seat, strategy in enumerate(strategies)]
+        for player in players:
+            player.set_opponents([opponent for opponent in players
+                                  if opponent is not player])
+        seat = 0
+
+        # Play turns until a player reaches the target
+        while True:
+            player = players[seat]
+            action = player.request_action()
+
+            if action == "r":
+                outcome = roll_dice()
+                player.update_total_rolls()
+                player.update_last_roll(totals[outcome])
+                # A bust ends the turn with no points
+                effect = effects[outcome]
+                if effect:
+                    player.reset_turn_stats()
+                    if effect == Rules.BUST_ALL:
+                        player.set_state((0,) + player.get_state()[1:])
+                    seat = (seat + 1) % n_players
+                    continue
+                player.update_turn_score(points[outcome])
+                if player.get_current_score() + player.get_total_score() >= target:
+                    player.commit_score()
+                    player.reset_turn_stats()
+                    break
+            elif action == "h":
+                player.commit_score()
+                player.reset_turn_stats()
+                seat = (seat + 1) % n_players
+            else:
+                raise ValueError("Invalid action {!r} from {}."
+                                 .format(action, player.get_name()))
+
+        # Record the game's results
+        winners[game] = seat
+        offset = game * n_players
+        for index, player in enumerate(players):
+            scores[offset + index] = player.get_total_score()
+            rolls[offset + index] = player.get_total_rolls()
+
+    return SimulationResult(n_players, winners, scores, rolls)
+
+
+def run(argv=None):
+    """
+    Plays games between computer players without any input, writing
+    each game's result to standard output as soon as it finishes.
+
+    Game number i is played with seed S + i, so any game of a batch can
+    be replayed on its own.
+
+    Parameters:
+        argv (list): The command line arguments after "run". Defaults
+                     to None, which reads them from sys.argv.
+    """
+
+    import argparse
+
+    # Setup arguments
+    parser = argparse.ArgumentParser(prog="pig.py run")
+    parser.add_argument('--players',
+                        help='Comma-separated player types in turn order, each computer, '
+                             'optimal or search, e.g. computer,computer.',
+                        required=True,
+                        type=str
+                        )
+    parser.add_argument('--games',
+                        help='The number of games to play. Defaults to 1.',
+                        default=1,
+                        type=int
+                        )
+    parser.add_argument('--seed',
+                        help='The seed of the first game. Defaults to a random seed.',
+                        type=int
+                        )
+    parser.add_argument('--format',
+                        help='Write each result as a JSON line or as text. Defaults to text.',
+                        choices=('json', 'text'),
+                        default='text'
+                        )
+    args = parser.parse_args(argv)
+
+    # Check for correct values
+    player_types = [player_type.strip().lower() for player_type in args.players.split(",")]
+    for number, player_type in enumerate(player_types, 1):
+        if player_type not in ("computer", "optimal", "search"):
+            parser.error("You entered an invalid player type for player{}. Valid types are computer, optimal or search. Please try again.".format(number))
+
+    seed = args.seed if args.seed is not None else int.from_bytes(os.urandom(4), 'little')
+    if args.format == 'json':
+        import json
+        encode = json.JSONEncoder(separators=(",", ":")).encode
+    factory = PlayerFactory()
+    renderer = NullRenderer()
+
+    try:
+        for number in range(args.games):
+            players = [factory.get_player("Computer [Player {}]".format(seat), player_type)
+                       for seat, player_type in enumerate(player_types, 1)]
+            Game(players, seed + number, renderer).run_until_done()
+            scores = [player.get_total_score() for player in players]
+            winner = scores.index(max(scores))
+            if args.format == 'json':
+                line = encode({"game": number, "seed": seed + number, "winner": winner,
+                               "scores": scores,
+                               "rolls": [player.get_total_rolls() for player in players]})
+            else:
+                line = "Game {} (seed {}): {} wins with {} points.".format(
+                    number + 1, seed + number, players[winner].get_name(), scores[winner])
+            # Flush every line so readers see each game as it finishes
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader stopped early, which is not an error
+        sys.stdout = None
+
+
 def main():
     """The method that runs when the program is executed."""
 
+    # The batch mode has its own arguments
+    if sys.argv[1:2] == ["run"]:
+        run(sys.argv[2:])
+        return
+
+    import argparse
+
     # Setup arguments
     parser = argparse.ArgumentParser()
     parser.add_argument('--player1',
-                        help='Player 1 type, computer or human.',
+                        help='Player 1 type, computer, optimal, search or human.',
                         type=str
                         )
     parser.add_argument('--player2',
-                        help='Player 2 type, computer or human.',
+                        help='Player 2 type, computer, optimal, search or human.',
+                        type=str
+                        )
+    parser.add_argument('--players',
+                        help='Comma-separated player types for a game of any number of players, '
+                             'e.g. computer,human,computer. Replaces --player1 and --player2.',
                         type=str
                         )
     parser.add_argument('--timed',
                         action='store_true',
-                        help='Whichever player has the most points after one minute wins the game.'
+                        help='Whichever player has the most points when the time runs out wins the game.'
+                        )
+    parser.add_argument('--duration',
+                        help='The length of a timed game in seconds. Defaults to 60.',
+                        default=60,
+                        type=float
+                        )
+    parser.add_argument('--metrics',
+                        action='store_true',
+                        help='Print the game\'s counters and decision times as JSON to standard error when it ends.'
+                        )
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Sample the game loop\'s stack and add the busiest functions to --metrics.'
                         )
     args = parser.parse_args()
 
-    # Check for required arguments and correct values
-    if not args.player1 and not args.player2:
-        print("The --player1 and --player2 arguments are required. Valid types are computer or human. Please try again.")
-        sys.exit()
-
-    if not args.player1.lower() == "computer" and not args.player1.lower() == "human":
-        print("You entered an invalid player type for player1. Valid types are computer or human. Please try again.")
-        sys.exit()
-
-    if not args.player2.lower() == "computer" and not args.player2.lower() == "human":
-        print("You entered an invalid player type for player2. Valid types are computer or human. Please try again.")
-        sys.exit()
-
-    # Create a queue for the players
-    players = Queue()
-
-    # Ask for player names if they are human
-    player1_name = "Computer [Player 1]" if args.player1.lower() == "computer" \
-        else input("What is Player 1's name? ")
-
-    player2_name = "Computer [Player 2]" if args.player2.lower() == "computer" \
-        else input("What is Player 2's name? ")
-
-    # Use PlayerFactory to get correct player classes and add to players queue
-    players.put(PlayerFactory().get_player(player1_name, args.player1.lower()))
-    players.put(PlayerFactory().get_player(player2_name, args.player2.lower()))
+    # Collect the player types in turn order
+    if args.players:
+        player_types = [player_type.strip().lower() for player_type in args.players.split(",")]
+    else:
+        # Check for required arguments
+        if not args.player1 or not args.player2:
+            print("The --player1 and --player2 arguments are required. Valid types are computer, optimal, search or human. Please try again.")
+            sys.exit()
+        player_types = [args.player1.lower(), args.player2.lower()]
+
+    # Check for correct values
+    for number, player_type in enumerate(player_types, 1):
+        if player_type not in ("computer", "optimal", "search", "human"):
+            print("You entered an invalid player type for player{}. Valid types are computer, optimal, search or human. Please try again.".format(number))
+            sys.exit()
+
+    # Ask for player names if they are human, and use PlayerFactory to
+    # get correct player classes
+    players = []
+    for number, player_type in enumerate(player_types, 1):
+        player_name = "Computer [Player {}]".format(number) if player_type != "human" \
+            else input("What is Player {}'s name? ".format(number))
+        players.append(PlayerFactory().get_player(player_name, player_type))
+
+    # Only load the instrumentation when it is asked for
+    metrics = None
+    if args.metrics or args.profile:
+        from pig_metrics import GameMetrics
+        metrics = GameMetrics()
+        if args.profile:
+            metrics.start_profiler()
 
     # Use GameFactory to get correct game class and start the game
-    TimedGameProxy(players).start(args.timed)
+    TimedGameProxy(players).start(args.timed, args.duration, metrics)
+
+    if metrics is not None:
+        import json
+        metrics.stop_profiler()
+        print(json.dumps(metrics.snapshot(), indent=1), file=sys.stderr)
 
     # Exit the program after the game is over
     sys.exit()
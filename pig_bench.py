@@ -0,0 +1,356 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_bench.py: Benchmarks for the hot paths of Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import gc
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+from pig import Players, ComputerPlayer, Die, Game, TimedGame, NullRenderer
+
+# The number of die rolls, decisions and rotations per game of a size
+_OPERATIONS_PER_GAME = 1000
+
+
+def _bench_die_roll(n_games, n_players, seed):
+    """
+    Prepares a run of Die.roll calls.
+
+    Parameters:
+        n_games (int): The size of the run, in games.
+        n_players (int): Ignored, rolls do not depend on the players.
+        seed (int): The seed of the die.
+
+    Returns:
+        (tuple): The function to time and its number of operations.
+    """
+
+    die = Die(seed)
+    count = n_games * _OPERATIONS_PER_GAME
+
+    def run():
+        roll = die.roll
+        for _ in range(count):
+            roll()
+
+    return run, count
+
+
+def _bench_request_action(n_games, n_players, seed):
+    """
+    Prepares a run of ComputerPlayer.request_action calls.
+
+    Parameters:
+        n_games (int): The size of the run, in games.
+        n_players (int): The number of players deciding.
+        seed (int): The seed of the die giving the players their scores.
+
+    Returns:
+        (tuple): The function to time and its number of operations.
+    """
+
+    # Give every player a different state to decide on
+    die = Die(seed)
+    players = [ComputerPlayer("Player {}".format(number)) for number in range(n_players)]
+    # Seating the players gives each one its opponents
+    Players(players)
+    for player in players:
+        for _ in range(die.roll() + die.roll()):
+            player.update_turn_score(die.roll())
+        player.commit_score()
+        player.update_turn_score(die.roll() * 3)
+    count = n_games * _OPERATIONS_PER_GAME // n_players * n_players
+
+    def run():
+        for _ in range(count // n_players):
+            for player in players:
+                player.request_action()
+
+    return run, count
+
+
+def _bench_game(n_games, n_players, seed):
+    """
+    Prepares a run of whole games with their output suppressed.
+
+    Parameters:
+        n_games (int): The number of games.
+        n_players (int): The number of players in each game.
+        seed (int): The seed of the first game.
+
+    Returns:
+        (tuple): The function to time and its number of operations.
+    """
+
+    def run():
+        renderer = NullRenderer()
+        for number in range(n_games):
+            players = [ComputerPlayer("Player {}".format(seat)) for seat in range(n_players)]
+            Game(players, seed + number, renderer).run_until_done()
+
+    return run, n_games
+
+
+def _bench_players_rotation(n_games, n_players, seed):
+    """
+    Prepares a run of Players.get_next_player calls.
+
+    Parameters:
+        n_games (int): The size of the run, in games.
+        n_players (int): The number of players to rotate through.
+        seed (int): Ignored, rotation does not use the die.
+
+    Returns:
+        (tuple): The function to time and its number of operations.
+    """
+
+    players = Players([ComputerPlayer("Player {}".format(seat)) for seat in range(n_players)])
+    count = n_games * _OPERATIONS_PER_GAME
+
+    def run():
+        next_player = players.get_next_player
+        for _ in range(count):
+            next_player()
+
+    return run, count
+
+
+def _bench_timed_game(n_games, n_players, seed):
+    """
+    Prepares a run of whole timed games with their output suppressed.
+
+    The games never run out of time, so comparing with the Game
+    benchmark shows the overhead of the clock.
+
+    Parameters:
+        n_games (int): The number of games.
+        n_players (int): The number of players in each game.
+        seed (int): The seed of the first game.
+
+    Returns:
+        (tuple): The function to time and its number of operations.
+    """
+
+    def run():
+        renderer = NullRenderer()
+        for number in range(n_games):
+            players = [ComputerPlayer("Player {}".format(seat)) for seat in range(n_players)]
+            TimedGame(players, seed + number, renderer, duration=3600).run_until_done()
+
+    return run, n_games
+
+
+# The benchmarks by name, with whether they depend on the player count
+BENCHMARKS = {
+    "die_roll": (_bench_die_roll, False),
+    "request_action": (_bench_request_action, True),
+    "game": (_bench_game, True),
+    "players_rotation": (_bench_players_rotation, True),
+    "timed_game": (_bench_timed_game, True),
+}
+
+
+def _percentile(values, fraction):
+    """
+    Returns a percentile of some values by the nearest-rank method.
+
+    Parameters:
+        values (list): The values.
+        fraction (float): The percentile, as a fraction.
+
+    Returns:
+        (float): The percentile.
+    """
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def time_benchmark(name, n_games, n_players, repeats=7, seed=0):
+    """
+    Times one benchmark at one size.
+
+    Every repeat is prepared afresh and timed with the garbage
+    collector off, so repeats do not disturb each other.
+
+    Parameters:
+        name (str): The name of the benchmark, see BENCHMARKS.
+        n_games (int): The size of the run, in games.
+        n_players (int): The number of players.
+        repeats (int): The number of timed runs. Defaults to 7.
+        seed (int): The seed of the runs. Defaults to 0.
+
+    Returns:
+        (dict): The benchmark's parameters, and the median and 95th
+                percentile seconds of a run and the operations per
+                second at the median.
+    """
+
+    prepare, _ = BENCHMARKS[name]
+    times = []
+    for _ in range(repeats):
+        run, operations = prepare(n_games, n_players, seed)
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        finally:
+            if collecting:
+                gc.enable()
+
+    median = _percentile(times, 0.5)
+    return {"benchmark": name, "games": n_games, "players": n_players,
+            "operations": operations, "repeats": repeats,
+            "median_s": median, "p95_s": _percentile(times, 0.95),
+            "ops_per_s": operations / median if median else None}
+
+
+def run_benchmarks(names=None, game_counts=(10, 100, 1000), player_counts=(2, 4, 8),
+                   repeats=7, seed=0):
+    """
+    Times every benchmark at every game count and player count.
+
+    Parameters:
+        names (sequence): The names of the benchmarks. Defaults to None,
+                          which runs all of them.
+        game_counts (sequence): The sizes of the runs, in games.
+        player_counts (sequence): The numbers of players.
+        repeats (int): The number of timed runs of each size.
+        seed (int): The seed of the runs.
+
+    Returns:
+        (dict): The environment and the results of every run.
+    """
+
+    results = []
+    for name in names or BENCHMARKS:
+        _, uses_players = BENCHMARKS[name]
+        for n_games in game_counts:
+            for n_players in player_counts if uses_players else player_counts[:1]:
+                results.append(time_benchmark(name, n_games, n_players, repeats, seed))
+
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "results": results}
+
+
+def compare(baseline, report, tolerance=0.1):
+    """
+    Finds the runs that got slower than in a baseline report.
+
+    Parameters:
+        baseline (dict): The report of the baseline version.
+        report (dict): The report of the current version.
+        tolerance (float): The fraction a median may grow by before it
+                           counts as slower. Defaults to 0.1.
+
+    Returns:
+        (list): The (benchmark, games, players, slowdown) of every
+                slower run, where the slowdown is the ratio of the
+                medians.
+    """
+
+    def key(result):
+        return result["benchmark"], result["games"], result["players"]
+
+    before = {key(result): result["median_s"] for result in baseline["results"]}
+    slower = []
+    for result in report["results"]:
+        if before.get(key(result)):
+            ratio = result["median_s"] / before[key(result)]
+            if ratio > 1 + tolerance:
+                slower.append(key(result) + (ratio,))
+    return slower
+
+
+def main():
+    """The method that runs when the program is executed."""
+
+    # Setup arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--benchmarks',
+                        help='Comma-separated benchmarks to run. Defaults to all of {}.'.format(
+                            ', '.join(BENCHMARKS)),
+                        type=str
+                        )
+    parser.add_argument('--games',
+                        help='Comma-separated run sizes in games. Defaults to 10,100,1000.',
+                        default='10,100,1000',
+                        type=str
+                        )
+    parser.add_argument('--players',
+                        help='Comma-separated player counts. Defaults to 2,4,8.',
+                        default='2,4,8',
+                        type=str
+                        )
+    parser.add_argument('--repeats',
+                        help='The number of timed runs of each size. Defaults to 7.',
+                        default=7,
+                        type=int
+                        )
+    parser.add_argument('--seed',
+                        help='The seed of the runs. Defaults to 0.',
+                        default=0,
+                        type=int
+                        )
+    parser.add_argument('--output',
+                        help='The path to write the JSON report to. Defaults to standard output.',
+                        type=str
+                        )
+    parser.add_argument('--compare',
+                        help='The path of a baseline JSON report. Exits with status 1 if any '
+                             'run got slower.',
+                        type=str
+                        )
+    parser.add_argument('--tolerance',
+                        help='The fraction a median may grow by before it counts as slower. '
+                             'Defaults to 0.1.',
+                        default=0.1,
+                        type=float
+                        )
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.benchmarks.split(",")] if args.benchmarks else None
+    for name in names or ():
+        if name not in BENCHMARKS:
+            print("You entered an invalid benchmark {}. Valid benchmarks are {}. Please try again.".format(
+                name, ', '.join(BENCHMARKS)))
+            sys.exit(2)
+
+    report = run_benchmarks(names,
+                            [int(count) for count in args.games.split(",")],
+                            [int(count) for count in args.players.split(",")],
+                            args.repeats, args.seed)
+
+    # Write the report
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    # Check for regressions against the baseline
+    if args.compare:
+        with open(args.compare) as baseline:
+            slower = compare(json.load(baseline), report, args.tolerance)
+        for name, n_games, n_players, ratio in slower:
+            print("{} ({} games, {} players) is {:.2f}x slower.".format(name, n_games, n_players, ratio),
+                  file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_evaluate.py: Exact win probabilities for pairs of Pig strategies."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import numpy as np
+from pig import Player, ComputerPlayer
+
+# Decision tables and results already computed by this process
+_tables = {}
+_results = {}
+
+
+def policy_table(policy, target=100):
+    """
+    Returns a strategy's decision for every state.
+
+    Parameters:
+        policy (callable, class or ComputerPlayer): Either a function
+                                    taking (score, opponent score, turn
+                                    score) and returning whether to
+                                    roll, a Player subclass, or a
+                                    ComputerPlayer with its own hold
+                                    threshold and target.
+        target (int): The score needed to win. Defaults to 100.
+
+    Returns:
+        (array): Whether the strategy rolls, indexed [score, opponent
+                 score, turn score].
+    """
+
+    # ComputerPlayers with the same parameters share one table
+    if policy is ComputerPlayer:
+        policy = ComputerPlayer("Player")
+    if type(policy) is ComputerPlayer:
+        key = (ComputerPlayer, policy.get_hold_at(), policy.get_target(), target)
+    else:
+        key = (policy, target)
+    if key in _tables:
+        return _tables[key]
+
+    if type(policy) is ComputerPlayer:
+        # The threshold rule can be evaluated for every state at once
+        i, _, k = np.ogrid[:target, :target, :target]
+        table = np.broadcast_to(
+            k < np.minimum(policy.get_hold_at(), policy.get_target() - (i + k)),
+            (target, target, target))
+    else:
+        if isinstance(policy, type) and issubclass(policy, Player):
+            policy = _player_policy(policy)
+        table = np.zeros((target, target, target), dtype=bool)
+        for score in range(target):
+            for opponent_score in range(target):
+                for turn_score in range(target - score):
+                    table[score, opponent_score, turn_score] = bool(
+                        policy(score, opponent_score, turn_score))
+
+    _tables[key] = table
+    return table
+
+
+def _player_policy(player_class):
+    """
+    Wraps a Player subclass as a state to action function.
+
+    Parameters:
+        player_class (class): The Player subclass.
+
+    Returns:
+        (function): A function taking (score, opponent score, turn
+                    score) and returning whether the player rolls.
+    """
+
+    player = player_class("Player")
+    opponent = Player("Opponent")
+    player.set_opponents([opponent])
+
+    def policy(score, opponent_score, turn_score):
+        player._total_score = score
+        player._current_score = turn_score
+        opponent._total_score = opponent_score
+        return player.request_action() == "r"
+
+    return policy
+
+
+def win_probability(first, second, target=100):
+    """
+    Computes the exact probability that the first player wins.
+
+    The two fixed strategies turn the game into a Markov chain, which
+    is solved exactly. Results are remembered, so repeated queries are
+    free.
+
+    Parameters:
+        first (callable, class or ComputerPlayer): The strategy of the
+                                   player who moves first, see
+                                   policy_table.
+        second (callable, class or ComputerPlayer): The strategy of the
+                                   other player.
+        target (int): The score needed to win. Defaults to 100.
+
+    Returns:
+        (float): The probability that the first player wins.
+    """
+
+    key = (_result_key(first), _result_key(second), target)
+    if key not in _results:
+        _results[key] = _solve_chain(policy_table(first, target),
+                                     policy_table(second, target),
+                                     target)
+    return _results[key]
+
+
+def _result_key(policy):
+    """
+    Returns the key a strategy's results are remembered under.
+
+    Parameters:
+        policy (callable, class or ComputerPlayer): The strategy.
+
+    Returns:
+        (object): The strategy itself, or the parameters of a
+                  ComputerPlayer.
+    """
+
+    if policy is ComputerPlayer:
+        policy = ComputerPlayer("Player")
+    if type(policy) is ComputerPlayer:
+        return (ComputerPlayer, policy.get_hold_at(), policy.get_target())
+    return policy
+
+
+def _solve_chain(first_rolls, second_rolls, target):
+    """
+    Solves the Markov chain of a game between two fixed strategies.
+
+    Banked scores never go down, so the states are solved from the
+    highest sum of banked scores down. For a pair of banked scores,
+    every turn state depends only on states that are already solved
+    and on the two turn-start states of the pair, which depend on each
+    other through busts and holds of nothing. The turn states are
+    written as linear functions of the other player's turn-start state
+    and the resulting two-unknown system is solved directly.
+
+    Parameters:
+        first_rolls (array): The first player's decision table.
+        second_rolls (array): The second player's decision table.
+        target (int): The score needed to win.
+
+    Returns:
+        (float): The probability that the first player wins.
+    """
+
+    # The first player's win probability at the start of a turn, for
+    # the first player moving, indexed [first score, second score],
+    # and for the second player moving, indexed [second score, first
+    # score]
+    first_start = np.zeros((target, target))
+    second_start = np.zeros((target, target))
+
+    for total in range(2 * target - 2, -1, -1):
+        first_score = np.arange(max(0, total - target + 1), min(target - 1, total) + 1)
+        second_score = total - first_score
+
+        first_offset, first_slope = _turn_values(
+            first_rolls, first_score, second_score, second_start.T, 1.0, target)
+        second_offset, second_slope = _turn_values(
+            second_rolls, second_score, first_score, first_start.T, 0.0, target)
+
+        # first = first_offset + first_slope * second and
+        # second = second_offset + second_slope * first
+        determinant = 1.0 - first_slope * second_slope
+        first_value = np.divide(first_offset + first_slope * second_offset, determinant,
+                                out=np.zeros_like(determinant), where=determinant > 0)
+        first_start[first_score, second_score] = first_value
+        second_start[second_score, first_score] = second_offset + second_slope * first_value
+
+    return float(first_start[0, 0])
+
+
+def _turn_values(rolls, score, other_score, other_start, win, target):
+    """
+    Computes a player's turn-start probabilities as linear functions
+    of the other player's turn-start probability.
+
+    Parameters:
+        rolls (array): The player's decision table.
+        score (array): The player's banked scores.
+        other_score (array): The other player's banked scores.
+        other_start (array): The solved probabilities for the other
+                             player moving, indexed [player score,
+                             other score].
+        win (float): The first player's win probability when this
+                     player reaches the target.
+        target (int): The score needed to win.
+
+    Returns:
+        (tuple): The offset and slope of each turn-start probability.
+    """
+
+    # Turn totals that reach the target end the game
+    totals = np.arange(target + 6)
+    offset = np.where(score[:, None] + totals >= target, win, 0.0)
+    slope = np.zeros_like(offset)
+
+    for turn_score in range(target - 1, -1, -1):
+        live = score + turn_score < target
+        # Rolling a 1 passes the die with nothing banked
+        roll_offset = offset[:, turn_score + 2:turn_score + 7].sum(axis=1) / 6.0
+        roll_slope = (1.0 + slope[:, turn_score + 2:turn_score + 7].sum(axis=1)) / 6.0
+        # Holding banks the turn total, or passes the die with nothing
+        # banked on a turn total of 0
+        if turn_score:
+            hold_offset = other_start[np.minimum(score + turn_score, target - 1), other_score]
+            hold_slope = 0.0
+        else:
+            hold_offset, hold_slope = 0.0, 1.0
+
+        rolling = rolls[score, np.minimum(other_score, target - 1), turn_score]
+        offset[:, turn_score] = np.where(live, np.where(rolling, roll_offset, hold_offset),
+                                         offset[:, turn_score])
+        slope[:, turn_score] = np.where(live, np.where(rolling, roll_slope, hold_slope),
+                                        slope[:, turn_score])
+
+    return offset[:, 0], slope[:, 0]
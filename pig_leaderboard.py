@@ -0,0 +1,236 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_leaderboard.py: Persistent leaderboard of Pig players across games."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import argparse
+import sqlite3
+from pig import Renderer
+
+# The totals of each player are updated in place, and the ranking
+# indexes keep them ordered, so no query has to scan or sort
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    rolls INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_by_wins ON players (wins DESC, score DESC);
+CREATE INDEX IF NOT EXISTS players_by_score ON players (score DESC, wins DESC);
+"""
+
+_RECORD = """
+INSERT INTO players (name, games, wins, score, rolls) VALUES (?, 1, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    games = games + 1,
+    wins = wins + excluded.wins,
+    score = score + excluded.score,
+    rolls = rolls + excluded.rolls
+"""
+
+# The columns players can be ranked by, with the order of their index
+_ORDERS = {
+    "wins": "wins DESC, score DESC",
+    "score": "score DESC, wins DESC",
+}
+
+_COLUMNS = ("name", "games", "wins", "score", "rolls")
+
+
+class Leaderboard(object):
+    """This class is used to keep the totals of every player across games.
+
+    The totals are stored in an SQLite database. Recording a game
+    updates the totals of its players in place, and the top players
+    are read from an index, so both cost the same however many games
+    have been recorded.
+
+    Attributes:
+        _connection (Connection): The connection to the database.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for Leaderboard class.
+
+        Parameters:
+            path (str): The path of the database file. It is created
+                        if it does not exist.
+        """
+
+        self._connection = sqlite3.connect(path)
+        # Readers do not block the writer and commits do not wait for
+        # the disk on every game
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """The method to close the database."""
+
+        self._connection.close()
+
+    def record_game(self, players):
+        """
+        A method to add the result of a game.
+
+        Parameters:
+            players (sequence): The game's players. The player with
+                                the highest score is the winner.
+        """
+
+        self.record_games([players])
+
+    def record_games(self, games):
+        """
+        A method to add the results of many games in one transaction.
+
+        Parameters:
+            games (iterable): The players of each game. The player with
+                              the highest score in a game is its winner.
+        """
+
+        rows = []
+        for players in games:
+            winner = max(players, key=lambda player: player.get_total_score())
+            rows.extend((player.get_name().strip(), int(player is winner),
+                         player.get_total_score(), player.get_total_rolls())
+                        for player in players)
+        with self._connection:
+            self._connection.executemany(_RECORD, rows)
+
+    def get_player(self, name):
+        """
+        A method to get a player's totals.
+
+        Parameters:
+            name (str): The player's name.
+
+        Returns:
+            (dict): The player's name, games, wins, score and rolls,
+                    or None if the player has no games.
+        """
+
+        row = self._connection.execute(
+            "SELECT name, games, wins, score, rolls FROM players WHERE name = ?",
+            (name,)).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def top(self, count=10, by="wins"):
+        """
+        A method to get the best players.
+
+        Parameters:
+            count (int): The number of players. Defaults to 10.
+            by (str): The total to rank by, "wins" or "score". Ties are
+                      broken by the other one. Defaults to "wins".
+
+        Returns:
+            (list): The totals of each player, best first.
+        """
+
+        if by not in _ORDERS:
+            raise ValueError("Players can only be ranked by {}.".format(" or ".join(_ORDERS)))
+        rows = self._connection.execute(
+            "SELECT name, games, wins, score, rolls FROM players INDEXED BY players_by_{} "
+            "ORDER BY {} LIMIT ?".format(by, _ORDERS[by]), (count,))
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def rank(self, name, by="wins"):
+        """
+        A method to get a player's place on the leaderboard.
+
+        Parameters:
+            name (str): The player's name.
+            by (str): The total to rank by, "wins" or "score".
+                      Defaults to "wins".
+
+        Returns:
+            (int): The player's place, starting at 1, or None if the
+                   player has no games.
+        """
+
+        player = self.get_player(name)
+        if player is None:
+            return None
+        first, second = ("wins", "score") if by == "wins" else ("score", "wins")
+        # Count the players ahead with a range over the index
+        (ahead,) = self._connection.execute(
+            "SELECT COUNT(*) FROM players INDEXED BY players_by_{0} "
+            "WHERE {0} > ? OR ({0} = ? AND {1} > ?)".format(first, second),
+            (player[first], player[first], player[second])).fetchone()
+        return ahead + 1
+
+
+class LeaderboardRenderer(Renderer):
+    """This class is used to add every game it is given to a Leaderboard.
+
+    Attributes:
+        _leaderboard (Leaderboard): The leaderboard the games are added to.
+    """
+
+    def __init__(self, leaderboard):
+        """
+        The constructor for LeaderboardRenderer class.
+
+        Parameters:
+            leaderboard (Leaderboard): The leaderboard the games are
+                                       added to.
+        """
+
+        self._leaderboard = leaderboard
+
+    def leaderboard(self, players):
+        """Add the finished game to the leaderboard."""
+
+        self._leaderboard.record_game(players)
+
+
+def main():
+    """The method that runs when the program is executed."""
+
+    # Setup arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path',
+                        help='The path of the leaderboard database.',
+                        type=str
+                        )
+    parser.add_argument('--top',
+                        help='The number of players to show. Defaults to 10.',
+                        default=10,
+                        type=int
+                        )
+    parser.add_argument('--by',
+                        help='Rank players by wins or score. Defaults to wins.',
+                        choices=sorted(_ORDERS),
+                        default='wins'
+                        )
+    args = parser.parse_args()
+
+    with Leaderboard(args.path) as leaderboard:
+        players = leaderboard.top(args.top, args.by)
+
+    print("\nLEADERBOARD\n")
+    print("+-{:<32}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10, "-"*10))
+    print("| {:<32} | {:>10} | {:>10} | {:>10} |".format('Player', 'Games', 'Wins', 'Score'))
+    for player in players:
+        print("|-{:<32}-+-{:>10}-+-{:>10}-+-{:>10}-|".format("-"*32, "-"*10, "-"*10, "-"*10))
+        print("| {:<32} | {:>10} | {:>10} | {:>10} |".format(
+            player["name"], player["games"], player["wins"], player["score"]))
+    print("+-{:<32}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*32, "-"*10, "-"*10, "-"*10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_log.py: Compact binary event logs for games of Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import mmap
+import struct
+from pig import Player, Renderer
+
+# A log file starts with a magic string and is followed by 8-byte
+# records. A game starts with a 24-byte header record holding the
+# number of players, the game's number in the file and its 128-bit
+# seed. Every event is one record holding its kind, the seat of the
+# player, the roll and the player's turn and total scores after it.
+_MAGIC = b"PIGLOG1\0"
+_HEADER = struct.Struct("<BBxxI16s")
+_EVENT = struct.Struct("<BBBxHH")
+
+GAME = 0
+ROLL = 1
+BUST = 2
+HOLD = 3
+WIN = 4
+TIME_UP = 5
+
+
+class GameLogWriter(Renderer):
+    """This class is used to write the events of games to a log file.
+
+    It is a renderer, so it records any Game it is given to. Records
+    are collected in a buffer that is written to the file whenever it
+    fills up, so memory use stays bounded however many games are logged.
+
+    Attributes:
+        _file (file): The log file.
+        _buffer (bytearray): The records not yet written.
+        _buffer_size (int): The buffer size at which records are written.
+        _seats (dict): The seat of each player of the current game.
+        _games (int): The number of games logged.
+    """
+
+    def __init__(self, path, buffer_size=65536):
+        """
+        The constructor for GameLogWriter class.
+
+        Parameters:
+            path (str): The path of the log file. New games are
+                        appended to an existing file.
+            buffer_size (int): The buffer size at which records are
+                               written. Defaults to 64 KiB.
+        """
+
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._seats = {}
+        self._games = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def flush(self):
+        """The method to write the buffered records to the file."""
+
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        """The method to write the buffered records and close the file."""
+
+        self.flush()
+        self._file.close()
+
+    def _record(self, kind, player, roll=0):
+        """
+        The method to buffer an event.
+
+        Parameters:
+            kind (int): The kind of event.
+            player (Player): The player.
+            roll (int): The roll, or 0 if there was none.
+        """
+
+        self._buffer += _EVENT.pack(kind, self._seats[id(player)], roll,
+                                    player.get_current_score(), player.get_total_score())
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def game_started(self, players, seed):
+        """Record the header of a game."""
+
+        if not 0 <= seed < 1 << 128:
+            raise ValueError("Only seeds between 0 and 2**128 can be logged.")
+        self._seats = {id(player): seat for seat, player in enumerate(players)}
+        self._buffer += _HEADER.pack(GAME, len(players), self._games, seed.to_bytes(16, 'little'))
+        self._games += 1
+
+    def rolled(self, player, roll):
+        """Record a roll."""
+
+        self._record(ROLL, player, roll)
+
+    def busted(self, player, roll):
+        """Record a roll of 1."""
+
+        self._record(BUST, player, roll)
+
+    def reached_target(self, player, roll):
+        """Record a winning roll."""
+
+        self._record(WIN, player, roll)
+
+    def held(self, player):
+        """Record a hold."""
+
+        self._record(HOLD, player)
+
+    def timed_winner(self, players):
+        """Record the end of a timed game, with the player who was in turn."""
+
+        self._record(TIME_UP, players[-1])
+
+
+class LoggedGame(object):
+    """This class is used to store a game read from a log file.
+
+    Attributes:
+        _seed (int): The seed of the game's die.
+        _n_players (int): The number of players.
+        _events (list): The events, as (kind, seat, roll, turn score,
+                        total score) tuples.
+    """
+
+    def __init__(self, seed, n_players):
+        """
+        The constructor for LoggedGame class.
+
+        Parameters:
+            seed (int): The seed of the game's die.
+            n_players (int): The number of players.
+        """
+
+        self._seed = seed
+        self._n_players = n_players
+        self._events = []
+
+    def get_seed(self):
+        """
+        The getter for the _seed attribute.
+
+        Returns:
+            (int): The seed of the game's die.
+        """
+
+        return self._seed
+
+    def get_n_players(self):
+        """
+        The getter for the _n_players attribute.
+
+        Returns:
+            (int): The number of players.
+        """
+
+        return self._n_players
+
+    def get_events(self):
+        """
+        The getter for the _events attribute.
+
+        Returns:
+            (list): The events, as (kind, seat, roll, turn score,
+                    total score) tuples.
+        """
+
+        return self._events
+
+    def get_winner(self):
+        """
+        A method to get the seat of the player who reached the target.
+
+        Returns:
+            (int): The winning seat, or None if no player reached it.
+        """
+
+        for kind, seat, _, _, _ in reversed(self._events):
+            if kind == WIN:
+                return seat
+        return None
+
+
+class GameLogReader(object):
+    """This class is used to read a log file written by GameLogWriter.
+
+    The file is memory-mapped, so reading it does not load it into
+    memory first.
+
+    Attributes:
+        _file (file): The log file.
+        _map (mmap): The memory-mapped log file.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for GameLogReader class.
+
+        Parameters:
+            path (str): The path of the log file.
+        """
+
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError("{} is not a Pig game log.".format(path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """The method to close the log file."""
+
+        self._map.close()
+        self._file.close()
+
+    def _records(self):
+        """
+        A generator over the records of the log.
+
+        Yields:
+            (tuple): The offset of the record and the record.
+        """
+
+        offset = len(_MAGIC)
+        end = len(self._map) - (len(self._map) - offset) % _EVENT.size
+        view = memoryview(self._map)[offset:end]
+        try:
+            for record in _EVENT.iter_unpack(view):
+                yield offset, record
+                offset += _EVENT.size
+        finally:
+            view.release()
+
+    def iter_games(self):
+        """
+        A generator over the games of the log.
+
+        Yields:
+            (LoggedGame): The next game.
+        """
+
+        game = None
+        skip = 0
+        for offset, record in self._records():
+            # The header's seed spans the two records after it
+            if skip:
+                skip -= 1
+                continue
+            if record[0] == GAME:
+                if game is not None:
+                    yield game
+                _, n_players, _, seed = _HEADER.unpack_from(self._map, offset)
+                game = LoggedGame(int.from_bytes(seed, 'little'), n_players)
+                skip = 2
+            else:
+                game._events.append(record)
+        if game is not None:
+            yield game
+
+    def aggregate(self):
+        """
+        A method to count the games and the events of each seat.
+
+        Returns:
+            (dict): The number of games, and for each of "rolls",
+                    "busts", "holds" and "wins" a list with the
+                    count for each seat.
+        """
+
+        # One counter per kind of event and seat
+        counts = [[0] * 256 for _ in range(TIME_UP + 1)]
+        games = 0
+        n_seats = 0
+        skip = 0
+        for _, (kind, seat, _, _, _) in self._records():
+            if skip:
+                skip -= 1
+            elif kind == GAME:
+                # The header stores the number of players in the seat field
+                games += 1
+                n_seats = max(n_seats, seat)
+                skip = 2
+            else:
+                counts[kind][seat] += 1
+
+        # Every bust and win is also a roll
+        rolls = [counts[ROLL][seat] + counts[BUST][seat] + counts[WIN][seat]
+                 for seat in range(n_seats)]
+        return {"games": games, "rolls": rolls, "busts": counts[BUST][:n_seats],
+                "holds": counts[HOLD][:n_seats], "wins": counts[WIN][:n_seats]}
+
+
+def replay(game, renderer):
+    """
+    Shows a logged game again through a renderer.
+
+    Parameters:
+        game (LoggedGame): The game to show.
+        renderer (Renderer): The renderer to show the game with.
+    """
+
+    players = [Player("Player {}".format(seat + 1)) for seat in range(game.get_n_players())]
+    renderer.game_started(tuple(players), game.get_seed())
+    in_turn = None
+
+    for kind, seat, roll, turn_score, total_score in game.get_events():
+        player = players[seat]
+        if seat != in_turn:
+            renderer.turn_started(player)
+            in_turn = seat
+
+        if kind in (ROLL, BUST, WIN):
+            player.update_total_rolls()
+            player.update_last_roll(roll)
+        # The scores come from the log, so points and busts follow the
+        # rules the game was played with, such as a double 1 taking
+        # away the total score
+        if kind != TIME_UP:
+            player.set_state((total_score, turn_score) + player.get_state()[2:])
+        if kind == ROLL:
+            renderer.rolled(player, roll)
+        elif kind == BUST:
+            renderer.busted(player, roll)
+            in_turn = None
+        elif kind == HOLD:
+            renderer.held(player)
+            player.reset_turn_stats()
+            in_turn = None
+        elif kind == WIN:
+            renderer.reached_target(player, roll)
+
+    # Keep the order the game uses, ending with the last player in turn
+    last = game.get_events()[-1][1] if game.get_events() else len(players) - 1
+    ordered = tuple(players[last + 1:] + players[:last + 1])
+    if game.get_events() and game.get_events()[-1][0] == TIME_UP:
+        renderer.timed_winner(ordered)
+    else:
+        renderer.winner(ordered)
+    renderer.leaderboard(ordered)
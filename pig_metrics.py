@@ -0,0 +1,288 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_metrics.py: Game loop counters, decision latencies and a sampling profiler for Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import sys
+import threading
+from collections import Counter
+
+# The upper bounds in seconds of the decision latency buckets
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, float("inf"))
+
+
+class GameMetrics(object):
+    """This class is used to count what happens in games and how long
+    players take to decide.
+
+    A GameMetrics is given to a Game, which reports every turn, decision
+    and action to it. Games without one skip all of this, so the
+    counters cost nothing when they are not used. One GameMetrics may
+    be shared by many games.
+
+    Attributes:
+        _counters (Counter): The number of games, turns, rolls, busts,
+                             holds, wins, invalid actions and timeouts.
+        _decisions (dict): The decision count, total and maximum
+                           seconds and latency bucket counts of each
+                           player type.
+        _profiler (SamplingProfiler): The profiler, or None if it has
+                                      never been started.
+    """
+
+    def __init__(self):
+        """The constructor for GameMetrics class."""
+
+        self._counters = Counter()
+        self._decisions = {}
+        self._profiler = None
+
+    def record_turn(self):
+        """The method to count a turn."""
+
+        self._counters["turns"] += 1
+
+    def record_game(self):
+        """The method to count a finished game."""
+
+        self._counters["games"] += 1
+
+    def record_decision(self, player, seconds):
+        """
+        The method to record how long a player took to decide.
+
+        Parameters:
+            player (Player): The player who decided.
+            seconds (float): The time the player took.
+        """
+
+        player_type = type(player).__name__
+        decisions = self._decisions.get(player_type)
+        if decisions is None:
+            decisions = self._decisions[player_type] = [0, 0.0, 0.0, [0] * len(LATENCY_BUCKETS)]
+        decisions[0] += 1
+        decisions[1] += seconds
+        if seconds > decisions[2]:
+            decisions[2] = seconds
+        # Find the first bucket the latency fits in
+        bucket = 0
+        while seconds > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        decisions[3][bucket] += 1
+
+    def record_action(self, player, action, game_over, effect=None):
+        """
+        The method to count the outcome of a player's action.
+
+        Parameters:
+            player (Player): The player who acted.
+            action (str): The player's action, or None if the player
+                          ran out of time.
+            game_over (bool): Whether or not the action ended the game.
+            effect (int): The effect of the roll under the game's
+                          rules, one of the Rules constants. Defaults
+                          to None, which counts a roll as scoring.
+        """
+
+        counters = self._counters
+        if action == "r":
+            counters["rolls"] += 1
+            # The rules decide what a bust is, not the roll's total
+            if effect:
+                counters["busts"] += 1
+            elif game_over:
+                counters["wins"] += 1
+        elif action == "h":
+            counters["holds"] += 1
+        elif action is None:
+            counters["timeouts"] += 1
+        else:
+            counters["invalid"] += 1
+
+    def start_profiler(self, interval=0.005):
+        """
+        The method to start sampling the calling thread's stack.
+
+        Parameters:
+            interval (float): The seconds between samples. Defaults to
+                              0.005.
+        """
+
+        if self._profiler is None:
+            self._profiler = SamplingProfiler(interval)
+        self._profiler.start()
+
+    def stop_profiler(self):
+        """The method to stop sampling. The samples taken are kept."""
+
+        if self._profiler is not None:
+            self._profiler.stop()
+
+    def reset(self):
+        """The method to clear the counters, latencies and samples."""
+
+        self._counters.clear()
+        self._decisions.clear()
+        if self._profiler is not None:
+            self._profiler.reset()
+
+    def snapshot(self, top=20):
+        """
+        A method to get the current values of the metrics.
+
+        Parameters:
+            top (int): The number of most sampled functions to include.
+                       Defaults to 20.
+
+        Returns:
+            (dict): The counters, and for each player type its decision
+                    count, total, mean and maximum seconds and latency
+                    bucket counts, and the most sampled functions if the
+                    profiler was started.
+        """
+
+        counters = dict.fromkeys(("games", "turns", "rolls", "busts", "holds",
+                                  "wins", "invalid", "timeouts"), 0)
+        counters.update(self._counters)
+        decisions = {
+            player_type: {"count": count, "total_s": total, "mean_s": total / count,
+                          "max_s": longest,
+                          "buckets": {"le_{:g}".format(bound): bucket_count
+                                      for bound, bucket_count in zip(LATENCY_BUCKETS, buckets)}}
+            for player_type, (count, total, longest, buckets) in self._decisions.items()}
+        snapshot = {"counters": counters, "decisions": decisions}
+        if self._profiler is not None:
+            snapshot["profile"] = self._profiler.get_top(top)
+        return snapshot
+
+
+class SamplingProfiler(object):
+    """This class is used to sample the stack of a running thread.
+
+    A background thread wakes up at a fixed interval and records the
+    function the profiled thread is running, and every function on its
+    stack. The profiled thread is never interrupted or traced, so it
+    runs at full speed between samples.
+
+    Attributes:
+        _interval (float): The seconds between samples.
+        _thread_id (int): The identifier of the profiled thread.
+        _own (Counter): The samples in which each function was running.
+        _total (Counter): The samples in which each function was on
+                          the stack.
+        _samples (int): The number of samples taken.
+        _stopping (Event): Set to stop the sampling thread.
+        _sampler (Thread): The sampling thread.
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        The constructor for SamplingProfiler class.
+
+        Parameters:
+            interval (float): The seconds between samples. Defaults to
+                              0.005.
+        """
+
+        self._interval = interval
+        self._thread_id = None
+        self._own = Counter()
+        self._total = Counter()
+        self._samples = 0
+        self._stopping = threading.Event()
+        self._sampler = None
+
+    def start(self, thread_id=None):
+        """
+        The method to start sampling.
+
+        Parameters:
+            thread_id (int): The identifier of the thread to profile.
+                             Defaults to None, which profiles the
+                             calling thread.
+        """
+
+        if self._sampler is not None:
+            return
+        self._thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self._stopping.clear()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        """The method to stop sampling."""
+
+        if self._sampler is not None:
+            self._stopping.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def reset(self):
+        """The method to discard the samples taken."""
+
+        self._own.clear()
+        self._total.clear()
+        self._samples = 0
+
+    def _sample(self):
+        """The method run by the sampling thread."""
+
+        while not self._stopping.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self._samples += 1
+            self._own[self._location(frame)] += 1
+            # Count recursive functions once per sample
+            seen = set()
+            while frame is not None:
+                seen.add(self._location(frame))
+                frame = frame.f_back
+            self._total.update(seen)
+
+    @staticmethod
+    def _location(frame):
+        """
+        Returns the name of the function a frame is running.
+
+        Parameters:
+            frame (frame): The stack frame.
+
+        Returns:
+            (str): The function's file, line and name.
+        """
+
+        code = frame.f_code
+        return "{}:{}:{}".format(code.co_filename, code.co_firstlineno, code.co_name)
+
+    def get_samples(self):
+        """
+        The getter for the _samples attribute.
+
+        Returns:
+            (int): The number of samples taken.
+        """
+
+        return self._samples
+
+    def get_top(self, count=20):
+        """
+        A method to get the functions that were sampled the most.
+
+        Parameters:
+            count (int): The number of functions. Defaults to 20.
+
+        Returns:
+            (list): For each function its name and the fractions of
+                    samples in which it was running and on the stack,
+                    most running first.
+        """
+
+        samples = max(self._samples, 1)
+        return [{"function": location, "own": own / samples,
+                 "total": self._total[location] / samples}
+                for location, own in self._own.most_common(count)]
@@ -0,0 +1,241 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_optimal.py: Optimal-play policy for two-player Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import os
+import mmap
+import struct
+from pig import ComputerPlayer
+
+# The table file starts with a magic string and the target score
+_MAGIC = b"PIGOPT1\0"
+_HEADER = struct.Struct("<8sI")
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "pig_optimal.bin")
+
+
+def solve(target=100, tolerance=1e-9):
+    """
+    Solves two-player Pig by value iteration.
+
+    The state is (my score, opponent score, turn total) for every
+    state where the player to move has not yet reached the target.
+
+    Parameters:
+        target (int): The score needed to win. Defaults to 100.
+        tolerance (float): The largest change in a win probability at
+                           which the iteration stops.
+
+    Returns:
+        (tuple): The win probability of the player to move for every
+                 state and whether rolling is the optimal action, both
+                 as arrays indexed [my score, opponent score, turn total].
+    """
+
+    import numpy as np
+
+    i, j, k = np.ogrid[:target, :target, :target]
+    # Turn totals that reach the target are wins, not states
+    valid = np.broadcast_to(i + k < target, (target, target, target))
+    banked = np.minimum(i + k, target - 1)
+
+    win = np.zeros((target, target, target))
+    # Padded by 6 turn totals so every roll can be looked up directly
+    padded = np.ones((target, target, target + 6))
+
+    while True:
+        padded[:, :, :target] = np.where(valid, win, 1.0)
+        start = win[:, :, 0]
+
+        # Holding passes the die with the turn total banked
+        hold = 1.0 - start[j, banked]
+        # Rolling a 1 passes the die with nothing banked, any other
+        # roll adds to the turn total
+        roll = (1.0 - start.T[:, :, None]) / 6.0
+        for face in range(2, 7):
+            roll = roll + padded[:, :, face:face + target] / 6.0
+
+        updated = np.where(valid, np.maximum(hold, roll), 0.0)
+        change = np.abs(updated - win).max()
+        win = updated
+        if change < tolerance:
+            return win, valid & (roll > hold)
+
+
+def write_table(path=DEFAULT_TABLE_PATH, target=100):
+    """
+    Solves the game and writes the roll/hold decisions to a file.
+
+    The decisions are stored one bit per state after a small header,
+    and the file is written under a temporary name and then renamed,
+    so readers never see a partial table.
+
+    Parameters:
+        path (str): The path of the table file.
+        target (int): The score needed to win. Defaults to 100.
+    """
+
+    import numpy as np
+
+    _, rolls = solve(target)
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as table:
+        table.write(_HEADER.pack(_MAGIC, target))
+        table.write(np.packbits(rolls.ravel()).tobytes())
+    os.replace(temporary, path)
+
+
+class PolicyTable(object):
+    """This class is used to look up optimal decisions in a table file.
+
+    The file is memory-mapped read-only, so opening it does no parsing
+    and every process using it shares the same cached pages.
+
+    Attributes:
+        _map (mmap): The memory-mapped table file.
+        _target (int): The score needed to win.
+    """
+
+    # Tables already opened by this process, by path
+    _open_tables = {}
+
+    def __init__(self, path):
+        """
+        The constructor for PolicyTable class.
+
+        Parameters:
+            path (str): The path of the table file.
+        """
+
+        with open(path, "rb") as table:
+            self._map = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._target = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            raise ValueError("{} is not a Pig policy table.".format(path))
+
+    @classmethod
+    def load(cls, path=DEFAULT_TABLE_PATH, target=100):
+        """
+        Returns the table at a path, solving and writing it first if
+        it does not exist yet.
+
+        Parameters:
+            path (str): The path of the table file.
+            target (int): The score needed to win. A table solved for
+                          another target is an error. Defaults to 100.
+
+        Returns:
+            (PolicyTable): The opened table.
+        """
+
+        if path not in cls._open_tables:
+            if not os.path.exists(path):
+                write_table(path, target)
+            cls._open_tables[path] = cls(path)
+        table = cls._open_tables[path]
+        if table.get_target() != target:
+            raise ValueError("{} is solved for a target of {}, not {}.".format(
+                path, table.get_target(), target))
+        return table
+
+    def get_target(self):
+        """
+        The getter for the _target attribute.
+
+        Returns:
+            (int): The score needed to win.
+        """
+
+        return self._target
+
+    def should_roll(self, score, opponent_score, turn_score):
+        """
+        A method to look up the optimal decision for a state.
+
+        Parameters:
+            score (int): The banked score of the player to move.
+            opponent_score (int): The banked score of the opponent.
+            turn_score (int): The turn total of the player to move.
+
+        Returns:
+            (bool): Whether or not rolling is the optimal action.
+        """
+
+        target = self._target
+        if score + turn_score >= target:
+            return False
+        index = (score * target + min(opponent_score, target - 1)) * target + turn_score
+        return bool(self._map[_HEADER.size + (index >> 3)] & (0x80 >> (index & 7)))
+
+    def to_array(self):
+        """
+        A method to unpack every decision at once.
+
+        Returns:
+            (array): Whether rolling is optimal, indexed [score,
+                     opponent score, turn score].
+        """
+
+        import numpy as np
+
+        target = self._target
+        bits = np.frombuffer(self._map, dtype=np.uint8, offset=_HEADER.size)
+        return np.unpackbits(bits, count=target ** 3).reshape(target, target, target).view(bool)
+
+
+class OptimalComputerPlayer(ComputerPlayer):
+    """This class is used to store details about an optimal computer player.
+
+    This class is a subclass of ComputerPlayer. Its decisions come from
+    a precomputed PolicyTable. With more than one opponent it plays
+    against the opponent with the highest score.
+
+    Attributes:
+        _name (str): The player's name.
+        _score (int): The player's total score.
+        _current_score (int): The player's score for the current turn.
+        _rolls (int): The player's number of rolls.
+        _last_roll (int): The player's last roll.
+        _opponents (list): The player's opponents.
+        _target (int): The total score the player is playing to.
+        _table (PolicyTable): The table of optimal decisions.
+    """
+
+    __slots__ = ('_table',)
+
+    def __init__(self, name, table_path=DEFAULT_TABLE_PATH, target=100):
+        """
+        The constructor for OptimalComputerPlayer class.
+
+        Parameters:
+            name (string): The player's name.
+            table_path (str): The path of the table file.
+            target (int): The total score the player is playing to.
+                          The table must be solved for it. Defaults
+                          to 100.
+        """
+
+        super().__init__(name, target=target)
+        self._table = PolicyTable.load(table_path, target)
+
+    def request_action(self, timeout=None):
+        """
+        Method to return the computer player's desired action.
+
+        Parameters:
+            timeout (float): Ignored, computer players answer at once.
+
+        Returns:
+            (str): The computer player's desired action.
+        """
+
+        opponent_score = max((opponent.get_total_score() for opponent in self._opponents),
+                             default=0)
+        return "r" if self._table.should_roll(
+            self._total_score, opponent_score, self._current_score) else "h"
@@ -0,0 +1,357 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_server.py: asyncio server hosting many concurrent games of Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import sys
+import argparse
+import asyncio
+from pig import Player, PlayerFactory, Game, TimedGame, TextRenderer
+from pig_search import SearchComputerPlayer
+
+
+class RemotePlayer(Player):
+    """This class is used to store details about a player connected
+    over a socket.
+
+    This class is a subclass of Player. Its actions are read from the
+    player's connection without blocking the server.
+
+    Attributes:
+        _name (str): The player's name.
+        _score (int): The player's total score.
+        _current_score (int): The player's score for the current turn.
+        _rolls (int): The player's number of rolls.
+        _last_roll (int): The player's last roll.
+        _opponents (list): The player's opponents.
+        _reader (StreamReader): The player's connection for reading.
+        _writer (StreamWriter): The player's connection for writing.
+    """
+
+    __slots__ = ('_reader', '_writer')
+
+    def __init__(self, name, reader, writer):
+        """
+        The constructor for RemotePlayer class.
+
+        Parameters:
+            name (string): The player's name.
+            reader (StreamReader): The player's connection for reading.
+            writer (StreamWriter): The player's connection for writing.
+        """
+
+        super().__init__(name)
+        self._reader = reader
+        self._writer = writer
+
+    def send(self, text):
+        """
+        Method to send a message to the player.
+
+        Parameters:
+            text (str): The message.
+        """
+
+        self._writer.write((text + "\n").encode())
+
+    async def request_action(self, timeout=None):
+        """
+        Method to return the player's desired action.
+
+        Parameters:
+            timeout (float): The number of seconds to wait for the
+                             player. Defaults to None, which waits
+                             for as long as it takes.
+
+        Returns:
+            (str): The player's desired action, or None if the
+                   player did not answer in time.
+        """
+
+        try:
+            self._writer.write(b"Enter 'r' to roll the die, or 'h' to hold. What you you like to do? ")
+            await self._writer.drain()
+            line = await asyncio.wait_for(self._reader.readline(), timeout)
+        except asyncio.TimeoutError:
+            self.send("")
+            return None
+        except ConnectionError:
+            line = b""
+        if not line:
+            raise ConnectionError("{} disconnected.".format(self._name))
+        return line.decode(errors="replace").strip()
+
+    def is_connected(self):
+        """
+        Method to check whether the player is still connected.
+
+        Returns:
+            (bool): False if the player has closed their connection.
+        """
+
+        return not self._reader.at_eof()
+
+    def close(self):
+        """Method to close the player's connection."""
+
+        self._writer.close()
+
+
+class BackgroundSearchComputerPlayer(SearchComputerPlayer):
+    """This class is used to store details about a searching computer
+    player hosted by the server.
+
+    This class is a subclass of SearchComputerPlayer. Its search runs
+    in a worker thread, so the event loop keeps serving the other
+    tables while it decides. The game waits for the answer, so nothing
+    the search reads changes while it runs.
+    """
+
+    __slots__ = ()
+
+    def request_action(self, timeout=None):
+        """
+        Method to return the computer player's desired action.
+
+        Parameters:
+            timeout (float): The seconds left to answer, see
+                             SearchComputerPlayer.request_action.
+
+        Returns:
+            (Future): The computer player's desired action, once the
+                      search is done.
+        """
+
+        return asyncio.get_running_loop().run_in_executor(
+            None, SearchComputerPlayer.request_action, self, timeout)
+
+
+class PigServer(object):
+    """This class is used to host games of Pig for remote players.
+
+    Connecting players are seated at the open table until its human
+    seats are filled, then the table's game starts and a new table is
+    opened. Every game runs as its own task on the event loop.
+
+    Attributes:
+        _player_types (list): The player type of each seat, in turn order.
+        _timed (bool): Whether or not the games are timed.
+        _duration (float): The length of a timed game in seconds.
+        _waiting (list): The remote players seated at the open table.
+        _tables (set): The tasks of the games being played.
+        _metrics (GameMetrics): The metrics every game reports to, or None.
+        _leaderboard (Leaderboard): The leaderboard finished games are
+                                    added to, or None.
+    """
+
+    def __init__(self, player_types, timed=False, duration=60, metrics=None, leaderboard=None):
+        """
+        The constructor for PigServer class.
+
+        Parameters:
+            player_types (list): The player type of each seat, in turn
+                                 order. Remote players take the human
+                                 seats.
+            timed (bool): Whether or not the games are timed.
+            duration (float): The length of a timed game in seconds.
+                              Defaults to 60.
+            metrics (GameMetrics): The metrics every game reports to.
+                                   Defaults to None.
+            leaderboard (Leaderboard): The leaderboard finished games
+                                       are added to. Defaults to None.
+        """
+
+        if "human" not in player_types:
+            raise ValueError("A table needs at least one human seat.")
+
+        self._player_types = player_types
+        self._timed = timed
+        self._duration = duration
+        self._waiting = []
+        self._tables = set()
+        self._metrics = metrics
+        self._leaderboard = leaderboard
+
+    def get_table_count(self):
+        """
+        A method to get the number of games being played.
+
+        Returns:
+            (int): The number of games being played.
+        """
+
+        return len(self._tables)
+
+    async def start(self, host="127.0.0.1", port=8211, path=None):
+        """
+        The method to start listening for players.
+
+        Parameters:
+            host (str): The host to listen on for TCP connections.
+            port (int): The port to listen on for TCP connections.
+            path (str): The path of a Unix socket to listen on instead
+                        of TCP. Defaults to None.
+
+        Returns:
+            (Server): The asyncio server.
+        """
+
+        # A deep backlog lets bursts of players connect at once
+        if path:
+            return await asyncio.start_unix_server(self._handle_client, path=path, backlog=4096)
+        return await asyncio.start_server(self._handle_client, host, port, backlog=4096)
+
+    async def _handle_client(self, reader, writer):
+        """
+        The method to seat a newly connected player.
+
+        Parameters:
+            reader (StreamReader): The player's connection for reading.
+            writer (StreamWriter): The player's connection for writing.
+        """
+
+        writer.write(b"What is your name? ")
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            writer.close()
+            return
+
+        player = RemotePlayer(line.decode(errors="replace"), reader, writer)
+        self._waiting.append(player)
+        player.send("Welcome {}, waiting for the other players to join.".format(player.get_name()))
+
+        # Players who left while waiting give up their seats, so they
+        # cannot end the game for the others
+        for waiting in self._waiting:
+            if not waiting.is_connected():
+                waiting.close()
+        self._waiting = [waiting for waiting in self._waiting if waiting.is_connected()]
+
+        # Start the game once every human seat is taken
+        if len(self._waiting) == self._player_types.count("human"):
+            remote_players, self._waiting = self._waiting, []
+            task = asyncio.create_task(self._run_table(remote_players))
+            self._tables.add(task)
+            task.add_done_callback(self._tables.discard)
+
+    async def _run_table(self, remote_players):
+        """
+        The method to play a game at a table.
+
+        Parameters:
+            remote_players (list): The remote players of the table.
+        """
+
+        # Fill the seats in order, remote players taking the human seats
+        # and search players deciding off the event loop
+        remote = iter(remote_players)
+        players = [next(remote) if player_type == "human"
+                   else BackgroundSearchComputerPlayer("Computer [Player {}]".format(number))
+                   if player_type == "search"
+                   else PlayerFactory().get_player("Computer [Player {}]".format(number), player_type)
+                   for number, player_type in enumerate(self._player_types, 1)]
+
+        def output(text):
+            for player in remote_players:
+                player.send(text)
+
+        if self._timed:
+            game = TimedGame(players, renderer=TextRenderer(output), duration=self._duration,
+                             metrics=self._metrics)
+        else:
+            game = Game(players, renderer=TextRenderer(output), metrics=self._metrics)
+        try:
+            await game.run_async()
+            # Games ended by a disconnect are not ranked
+            if self._leaderboard is not None:
+                self._leaderboard.record_game(players)
+        except ConnectionError as error:
+            output("{} The game is over.".format(error))
+        finally:
+            for player in remote_players:
+                player.close()
+
+
+def main():
+    """The method that runs when the program is executed."""
+
+    # Setup arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host',
+                        help='The host to listen on.',
+                        default='127.0.0.1',
+                        type=str
+                        )
+    parser.add_argument('--port',
+                        help='The port to listen on.',
+                        default=8211,
+                        type=int
+                        )
+    parser.add_argument('--unix',
+                        help='The path of a Unix socket to listen on instead of TCP.',
+                        type=str
+                        )
+    parser.add_argument('--players',
+                        help='Comma-separated player types of each table, e.g. human,computer. '
+                             'Connecting players take the human seats.',
+                        default='human,computer',
+                        type=str
+                        )
+    parser.add_argument('--timed',
+                        action='store_true',
+                        help='Whichever player has the most points when the time runs out wins the game.'
+                        )
+    parser.add_argument('--duration',
+                        help='The length of a timed game in seconds. Defaults to 60.',
+                        default=60,
+                        type=float
+                        )
+    parser.add_argument('--leaderboard',
+                        help='The path of a leaderboard database to add every finished game to.',
+                        type=str
+                        )
+    args = parser.parse_args()
+
+    player_types = [player_type.strip().lower() for player_type in args.players.split(",")]
+    for number, player_type in enumerate(player_types, 1):
+        if player_type not in ("computer", "optimal", "search", "human"):
+            print("You entered an invalid player type for player{}. Valid types are computer, optimal, search or human. Please try again.".format(number))
+            sys.exit()
+    if "human" not in player_types:
+        print("Every table needs at least one human player. Please try again.")
+        sys.exit()
+
+    # Solve the optimal table before serving, if it has not been solved
+    # yet, rather than on the event loop when the first table starts
+    if "optimal" in player_types:
+        from pig_optimal import PolicyTable
+        PolicyTable.load()
+
+    # Only load the leaderboard when it is asked for
+    leaderboard = None
+    if args.leaderboard:
+        from pig_leaderboard import Leaderboard
+        leaderboard = Leaderboard(args.leaderboard)
+
+    async def serve():
+        server = await PigServer(player_types, args.timed, args.duration,
+                                 leaderboard=leaderboard).start(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if leaderboard is not None:
+            leaderboard.close()
+
+
+if __name__ == '__main__':
+    main()
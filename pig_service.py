@@ -0,0 +1,313 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_service.py: Long-running service answering batches of Pig decisions."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import sys
+import json
+import socket
+import argparse
+import asyncio
+import numpy as np
+from pig import ComputerPlayer
+
+
+class DecisionService(object):
+    """This class is used to answer many roll or hold questions at once.
+
+    Every strategy's decision for every state is kept in a table the
+    first time the strategy is asked about, so a batch is answered by
+    indexing the tables of its strategies once each.
+
+    Strategies are named like in pig_tournament: computer[:hold
+    threshold], where the threshold defaults to 25, or optimal.
+
+    Attributes:
+        _target (int): The score needed to win.
+        _tables (dict): The decision table of each strategy, by name.
+    """
+
+    def __init__(self, target=100):
+        """
+        The constructor for DecisionService class.
+
+        Parameters:
+            target (int): The score needed to win. Defaults to 100.
+        """
+
+        self._target = target
+        self._tables = {}
+
+    def get_target(self):
+        """
+        The getter for the _target attribute.
+
+        Returns:
+            (int): The score needed to win.
+        """
+
+        return self._target
+
+    def get_table(self, strategy):
+        """
+        A method to get a strategy's decision for every state.
+
+        Parameters:
+            strategy (str): The strategy's name.
+
+        Returns:
+            (array): Whether the strategy rolls, indexed [score,
+                     opponent score, turn score].
+        """
+
+        table = self._tables.get(strategy)
+        if table is None:
+            kind, _, parameter = strategy.partition(":")
+            if kind == "computer":
+                from pig_evaluate import policy_table
+                hold_at = int(parameter) if parameter else 25
+                table = policy_table(ComputerPlayer("Player", hold_at=hold_at, target=self._target),
+                                     self._target)
+            elif kind == "optimal" and not parameter:
+                from pig_optimal import PolicyTable
+                table = PolicyTable.load(target=self._target).to_array()
+            else:
+                raise ValueError("Unknown strategy {!r}.".format(strategy))
+            self._tables[strategy] = table
+        return table
+
+    def warm(self, strategies):
+        """
+        A method to build the tables of strategies before they are used.
+
+        Parameters:
+            strategies (iterable): The names of the strategies.
+        """
+
+        for strategy in strategies:
+            self.get_table(strategy)
+
+    def decide(self, scores, opponent_scores, turn_scores, strategies):
+        """
+        A method to answer a batch of decisions.
+
+        Parameters:
+            scores (sequence): The banked score of each player to move.
+            opponent_scores (sequence): The highest banked score of
+                                        each player's opponents.
+            turn_scores (sequence): The turn total of each player.
+            strategies (sequence): The name of each player's strategy.
+
+        Returns:
+            (array): Whether each player rolls.
+        """
+
+        target = self._target
+        scores = np.asarray(scores, dtype=np.int64)
+        opponent_scores = np.asarray(opponent_scores, dtype=np.int64)
+        turn_scores = np.asarray(turn_scores, dtype=np.int64)
+        if not (scores.shape == opponent_scores.shape == turn_scores.shape == (len(strategies),)):
+            raise ValueError("Every query needs a score, opponent score, turn score and strategy.")
+        if scores.size and (min(scores.min(), opponent_scores.min(), turn_scores.min()) < 0
+                            or max(scores.max(), opponent_scores.max()) >= target):
+            raise ValueError("Banked scores must be from 0 to {}.".format(target - 1))
+
+        # Reaching the target wins at once, so those players hold and
+        # the rest index the tables within bounds
+        playing = scores + turn_scores < target
+        turn_scores = np.where(playing, turn_scores, 0)
+        rolls = np.zeros(scores.size, dtype=bool)
+
+        # Index each strategy's table once with all of its queries
+        names, groups = np.unique(np.asarray(strategies, dtype=str), return_inverse=True)
+        for number, strategy in enumerate(names):
+            members = groups == number
+            rolls[members] = self.get_table(str(strategy))[
+                scores[members], opponent_scores[members], turn_scores[members]]
+        return rolls & playing
+
+    def answer(self, request):
+        """
+        A method to answer a request of the service's protocol.
+
+        Parameters:
+            request (dict): The queries, a list of [score, opponent
+                            score, turn score, strategy].
+
+        Returns:
+            (dict): The action of each query, "r" or "h", in order, or
+                    the error if the request could not be answered.
+        """
+
+        if not isinstance(request, dict) or "queries" not in request:
+            return {"error": "A request needs a list of queries."}
+        try:
+            queries = request["queries"]
+            if not queries:
+                return {"actions": []}
+            scores, opponent_scores, turn_scores, strategies = zip(*queries)
+            rolls = self.decide(scores, opponent_scores, turn_scores, strategies)
+        except (TypeError, ValueError) as error:
+            return {"error": str(error)}
+        return {"actions": ["r" if roll else "h" for roll in rolls.tolist()]}
+
+    async def start(self, host="127.0.0.1", port=8212, path=None):
+        """
+        The method to start listening for requests.
+
+        Each request is one line of JSON, answered by one line of JSON.
+        A connection can send any number of requests.
+
+        Parameters:
+            host (str): The host to listen on for TCP connections.
+            port (int): The port to listen on for TCP connections.
+            path (str): The path of a Unix socket to listen on instead
+                        of TCP. Defaults to None.
+
+        Returns:
+            (Server): The asyncio server.
+        """
+
+        if path:
+            return await asyncio.start_unix_server(self._handle_client, path=path, backlog=4096,
+                                                   limit=1 << 24)
+        return await asyncio.start_server(self._handle_client, host, port, backlog=4096,
+                                          limit=1 << 24)
+
+    async def _handle_client(self, reader, writer):
+        """
+        The method to answer a connection's requests until it closes.
+
+        Parameters:
+            reader (StreamReader): The connection for reading.
+            writer (StreamWriter): The connection for writing.
+        """
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.answer(json.loads(line))
+                except ValueError as error:
+                    response = {"error": "Invalid JSON: {}".format(error)}
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class DecisionClient(object):
+    """This class is used to ask a DecisionService for decisions.
+
+    Attributes:
+        _socket (socket): The connection to the service.
+        _file (file): The connection, buffered for reading lines.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8212, path=None):
+        """
+        The constructor for DecisionClient class.
+
+        Parameters:
+            host (str): The host of the service.
+            port (int): The port of the service.
+            path (str): The path of the service's Unix socket, used
+                        instead of TCP. Defaults to None.
+        """
+
+        if path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """The method to close the connection."""
+
+        self._file.close()
+        self._socket.close()
+
+    def decide(self, queries):
+        """
+        A method to ask for a batch of decisions.
+
+        Parameters:
+            queries (list): The (score, opponent score, turn score,
+                            strategy) of each player to move.
+
+        Returns:
+            (list): The action of each query, "r" or "h", in order.
+        """
+
+        request = json.dumps({"queries": [list(query) for query in queries]},
+                             separators=(",", ":"))
+        self._socket.sendall(request.encode() + b"\n")
+        response = json.loads(self._file.readline())
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["actions"]
+
+
+def main():
+    """The method that runs when the program is executed."""
+
+    # Setup arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host',
+                        help='The host to listen on.',
+                        default='127.0.0.1',
+                        type=str
+                        )
+    parser.add_argument('--port',
+                        help='The port to listen on.',
+                        default=8212,
+                        type=int
+                        )
+    parser.add_argument('--unix',
+                        help='The path of a Unix socket to listen on instead of TCP.',
+                        type=str
+                        )
+    parser.add_argument('--warm',
+                        help='Comma-separated strategies to build before listening, '
+                             'e.g. computer:25,optimal. Defaults to computer.',
+                        default='computer',
+                        type=str
+                        )
+    args = parser.parse_args()
+
+    service = DecisionService()
+    try:
+        service.warm(strategy.strip().lower() for strategy in args.warm.split(",") if strategy.strip())
+    except ValueError as error:
+        print("{} Please try again.".format(error))
+        sys.exit()
+
+    async def serve():
+        server = await service.start(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,590 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_stats.py: Constant-memory, mergeable statistics over many games of Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import math
+from pig import Renderer
+
+
+class RunningStats(object):
+    """This class is used to keep the count, mean and variance of a
+    stream of values without storing the values.
+
+    The mean and variance are updated with Welford's method and two
+    RunningStats are merged with Chan's formula, so values may be
+    split across processes and combined afterwards.
+
+    Attributes:
+        _count (int): The number of values.
+        _mean (float): The mean of the values.
+        _m2 (float): The sum of squared differences from the mean.
+        _min (float): The smallest value, or None.
+        _max (float): The largest value, or None.
+    """
+
+    def __init__(self):
+        """The constructor for RunningStats class."""
+
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = None
+        self._max = None
+
+    def add(self, value):
+        """
+        A method to add a value.
+
+        Parameters:
+            value (float): The value.
+        """
+
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def merge(self, other):
+        """
+        A method to merge another RunningStats into this one.
+
+        Parameters:
+            other (RunningStats): The statistics to merge.
+        """
+
+        if not other._count:
+            return
+        count = self._count + other._count
+        delta = other._mean - self._mean
+        self._mean += delta * other._count / count
+        self._m2 += other._m2 + delta * delta * self._count * other._count / count
+        self._count = count
+        self._min = other._min if self._min is None else min(self._min, other._min)
+        self._max = other._max if self._max is None else max(self._max, other._max)
+
+    def get_count(self):
+        """
+        The getter for the _count attribute.
+
+        Returns:
+            (int): The number of values.
+        """
+
+        return self._count
+
+    def get_mean(self):
+        """
+        The getter for the _mean attribute.
+
+        Returns:
+            (float): The mean of the values.
+        """
+
+        return self._mean
+
+    def get_variance(self):
+        """
+        A method to get the sample variance of the values.
+
+        Returns:
+            (float): The sample variance, or 0.0 for fewer than two values.
+        """
+
+        return self._m2 / (self._count - 1) if self._count > 1 else 0.0
+
+    def get_stddev(self):
+        """
+        A method to get the sample standard deviation of the values.
+
+        Returns:
+            (float): The sample standard deviation.
+        """
+
+        return math.sqrt(self.get_variance())
+
+    def get_min(self):
+        """
+        The getter for the _min attribute.
+
+        Returns:
+            (float): The smallest value, or None.
+        """
+
+        return self._min
+
+    def get_max(self):
+        """
+        The getter for the _max attribute.
+
+        Returns:
+            (float): The largest value, or None.
+        """
+
+        return self._max
+
+    def summary(self):
+        """
+        A method to get the statistics as a dict.
+
+        Returns:
+            (dict): The count, mean, standard deviation, min and max.
+        """
+
+        return {"count": self._count, "mean": self._mean, "stddev": self.get_stddev(),
+                "min": self._min, "max": self._max}
+
+
+class Histogram(object):
+    """This class is used to count values in fixed-width buckets.
+
+    Values below the lowest bucket and at or above the highest bucket
+    are counted in an underflow and an overflow bucket.
+
+    Attributes:
+        _low (float): The lower edge of the first bucket.
+        _high (float): The upper edge of the last bucket.
+        _width (float): The width of each bucket.
+        _counts (list): The underflow count, the count of each bucket
+                        and the overflow count.
+    """
+
+    def __init__(self, low, high, n_buckets):
+        """
+        The constructor for Histogram class.
+
+        Parameters:
+            low (float): The lower edge of the first bucket.
+            high (float): The upper edge of the last bucket.
+            n_buckets (int): The number of buckets.
+        """
+
+        if high <= low or n_buckets < 1:
+            raise ValueError("A histogram needs a high edge above its low edge and at least one bucket.")
+        self._low = low
+        self._high = high
+        self._width = (high - low) / n_buckets
+        self._counts = [0] * (n_buckets + 2)
+
+    def add(self, value, count=1):
+        """
+        A method to add a value.
+
+        Parameters:
+            value (float): The value.
+            count (int): The number of times to add it. Defaults to 1.
+        """
+
+        if value < self._low:
+            index = 0
+        elif value >= self._high:
+            index = len(self._counts) - 1
+        else:
+            index = min(int((value - self._low) / self._width), len(self._counts) - 3) + 1
+        self._counts[index] += count
+
+    def merge(self, other):
+        """
+        A method to merge another Histogram with the same buckets into this one.
+
+        Parameters:
+            other (Histogram): The histogram to merge.
+        """
+
+        if (other._low, other._high, len(other._counts)) != (self._low, self._high, len(self._counts)):
+            raise ValueError("Only histograms with the same buckets can be merged.")
+        for index, count in enumerate(other._counts):
+            self._counts[index] += count
+
+    def get_edges(self):
+        """
+        A method to get the edges of the buckets.
+
+        Returns:
+            (list): The lower edge of each bucket and the upper edge of
+                    the last one.
+        """
+
+        return [self._low + index * self._width for index in range(len(self._counts) - 1)]
+
+    def get_counts(self):
+        """
+        The getter for the _counts attribute.
+
+        Returns:
+            (list): The underflow count, the count of each bucket and
+                    the overflow count.
+        """
+
+        return list(self._counts)
+
+    def summary(self):
+        """
+        A method to get the histogram as a dict.
+
+        Returns:
+            (dict): The bucket edges and counts.
+        """
+
+        return {"edges": self.get_edges(), "underflow": self._counts[0],
+                "counts": self._counts[1:-1], "overflow": self._counts[-1]}
+
+
+class QuantileSketch(object):
+    """This class is used to estimate quantiles of a stream of values.
+
+    Values are counted in buckets whose widths grow geometrically, so
+    every quantile is estimated within a fixed relative error and the
+    number of buckets only grows with the logarithm of the range of
+    the values. Two sketches with the same relative error merge
+    exactly by adding their bucket counts.
+
+    Attributes:
+        _relative_error (float): The relative error of the estimates.
+        _gamma (float): The ratio of the edges of each bucket.
+        _log_gamma (float): The natural logarithm of _gamma.
+        _positive (dict): The count of each bucket of positive values.
+        _negative (dict): The count of each bucket of negative values,
+                          by the bucket of their magnitude.
+        _zeros (int): The number of zero values.
+        _count (int): The number of values.
+    """
+
+    def __init__(self, relative_error=0.01):
+        """
+        The constructor for QuantileSketch class.
+
+        Parameters:
+            relative_error (float): The relative error of the estimates.
+                                    Defaults to 0.01.
+        """
+
+        if not 0 < relative_error < 1:
+            raise ValueError("The relative error must be between 0 and 1.")
+        self._relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+        self._count = 0
+
+    def add(self, value, count=1):
+        """
+        A method to add a value.
+
+        Parameters:
+            value (float): The value.
+            count (int): The number of times to add it. Defaults to 1.
+        """
+
+        self._count += count
+        if value == 0:
+            self._zeros += count
+            return
+        buckets = self._positive if value > 0 else self._negative
+        key = math.ceil(math.log(abs(value)) / self._log_gamma)
+        buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other):
+        """
+        A method to merge another QuantileSketch with the same relative
+        error into this one.
+
+        Parameters:
+            other (QuantileSketch): The sketch to merge.
+        """
+
+        if other._relative_error != self._relative_error:
+            raise ValueError("Only sketches with the same relative error can be merged.")
+        for buckets, other_buckets in ((self._positive, other._positive),
+                                       (self._negative, other._negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self._zeros += other._zeros
+        self._count += other._count
+
+    def get_count(self):
+        """
+        The getter for the _count attribute.
+
+        Returns:
+            (int): The number of values.
+        """
+
+        return self._count
+
+    def quantile(self, fraction):
+        """
+        A method to estimate a quantile of the values.
+
+        Parameters:
+            fraction (float): The quantile, as a fraction between 0 and 1.
+
+        Returns:
+            (float): The estimated quantile, or None if there are no values.
+        """
+
+        if not self._count:
+            return None
+        rank = fraction * (self._count - 1)
+
+        # Walk the buckets from the most negative value up
+        seen = 0
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self._zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self._positive))
+
+    def _value(self, key):
+        """
+        Returns the value a bucket stands for.
+
+        Parameters:
+            key (int): The bucket.
+
+        Returns:
+            (float): The value within the relative error of every value
+                     in the bucket.
+        """
+
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def summary(self, fractions=(0.5, 0.9, 0.95, 0.99)):
+        """
+        A method to get some quantiles as a dict.
+
+        Parameters:
+            fractions (sequence): The quantiles, as fractions.
+
+        Returns:
+            (dict): The estimated value of each quantile.
+        """
+
+        return {"p{:g}".format(fraction * 100): self.quantile(fraction) for fraction in fractions}
+
+
+class GameStats(Renderer):
+    """This class is used to keep summary statistics of many games.
+
+    It is a renderer, so it can be given to any Game and is fed by the
+    game loop. Simulations can be added with add_result, one chunk at a
+    time. Only fixed-size aggregates are kept, so memory does not grow
+    with the number of games, and GameStats from different processes
+    can be merged.
+
+    Attributes:
+        _games (int): The number of games.
+        _wins (list): The number of games won by each seat.
+        _turns (int): The number of turns played in Games.
+        _busts (int): The number of turns ended by a roll of 1.
+        _turn_rolls (RunningStats): The number of rolls in each turn.
+        _turn_rolls_histogram (Histogram): The number of rolls in each turn.
+        _game_rolls (RunningStats): The number of rolls in each game.
+        _game_rolls_sketch (QuantileSketch): The number of rolls in each game.
+        _margin (RunningStats): The winner's lead over the runner-up.
+        _margin_histogram (Histogram): The winner's lead over the runner-up.
+        _margin_sketch (QuantileSketch): The winner's lead over the runner-up.
+        _seats (dict): The seat of each player of the current game.
+        _rolls (int): The number of rolls so far in the current turn.
+        _game_rolls_so_far (int): The number of rolls so far in the
+                                  current game.
+    """
+
+    def __init__(self):
+        """The constructor for GameStats class."""
+
+        self._games = 0
+        self._wins = []
+        self._turns = 0
+        self._busts = 0
+        self._turn_rolls = RunningStats()
+        self._turn_rolls_histogram = Histogram(0, 30, 30)
+        self._game_rolls = RunningStats()
+        self._game_rolls_sketch = QuantileSketch()
+        self._margin = RunningStats()
+        self._margin_histogram = Histogram(0, 100, 20)
+        self._margin_sketch = QuantileSketch()
+        self._seats = {}
+        self._rolls = 0
+        self._game_rolls_so_far = 0
+
+    def _add_game(self, winner, scores, rolls):
+        """
+        The method to add the results of a game.
+
+        Parameters:
+            winner (int): The winning seat.
+            scores (sequence): The total score of each seat.
+            rolls (int): The number of rolls in the game.
+        """
+
+        self._games += 1
+        if winner >= len(self._wins):
+            self._wins.extend([0] * (winner + 1 - len(self._wins)))
+        self._wins[winner] += 1
+        runner_up = max((score for seat, score in enumerate(scores) if seat != winner), default=0)
+        margin = scores[winner] - runner_up
+        self._margin.add(margin)
+        self._margin_histogram.add(margin)
+        self._margin_sketch.add(margin)
+        self._game_rolls.add(rolls)
+        self._game_rolls_sketch.add(rolls)
+
+    def add_result(self, result):
+        """
+        A method to add the results of a simulation.
+
+        Simulations do not record turns, so only the wins, margins
+        and rolls per game are added.
+
+        Parameters:
+            result (SimulationResult): The results to add.
+        """
+
+        n_players = result.get_n_players()
+        scores = result.get_scores()
+        rolls = result.get_rolls()
+        for game, winner in enumerate(result.get_winners()):
+            offset = game * n_players
+            self._add_game(winner, scores[offset:offset + n_players],
+                           sum(rolls[offset:offset + n_players]))
+
+    def merge(self, other):
+        """
+        A method to merge another GameStats into this one.
+
+        Parameters:
+            other (GameStats): The statistics to merge.
+        """
+
+        self._games += other._games
+        if len(other._wins) > len(self._wins):
+            self._wins.extend([0] * (len(other._wins) - len(self._wins)))
+        for seat, wins in enumerate(other._wins):
+            self._wins[seat] += wins
+        self._turns += other._turns
+        self._busts += other._busts
+        self._turn_rolls.merge(other._turn_rolls)
+        self._turn_rolls_histogram.merge(other._turn_rolls_histogram)
+        self._game_rolls.merge(other._game_rolls)
+        self._game_rolls_sketch.merge(other._game_rolls_sketch)
+        self._margin.merge(other._margin)
+        self._margin_histogram.merge(other._margin_histogram)
+        self._margin_sketch.merge(other._margin_sketch)
+
+    def get_games(self):
+        """
+        The getter for the _games attribute.
+
+        Returns:
+            (int): The number of games.
+        """
+
+        return self._games
+
+    def get_win_rates(self):
+        """
+        A method to get the win rate of each seat.
+
+        Returns:
+            (list): The fraction of games won by each seat.
+        """
+
+        return [wins / self._games for wins in self._wins] if self._games else []
+
+    def get_bust_rate(self):
+        """
+        A method to get the fraction of turns ended by a roll of 1.
+
+        Returns:
+            (float): The bust rate, or 0.0 if no turns were played.
+        """
+
+        return self._busts / self._turns if self._turns else 0.0
+
+    def summary(self):
+        """
+        A method to get every statistic as a dict.
+
+        Returns:
+            (dict): The statistics.
+        """
+
+        return {"games": self._games, "wins": list(self._wins),
+                "win_rates": self.get_win_rates(),
+                "turns": self._turns, "bust_rate": self.get_bust_rate(),
+                "turn_rolls": dict(self._turn_rolls.summary(),
+                                   histogram=self._turn_rolls_histogram.summary()),
+                "game_rolls": dict(self._game_rolls.summary(),
+                                   quantiles=self._game_rolls_sketch.summary()),
+                "margin": dict(self._margin.summary(),
+                               histogram=self._margin_histogram.summary(),
+                               quantiles=self._margin_sketch.summary())}
+
+    def _end_turn(self):
+        """The method to add the turn that just ended."""
+
+        self._turns += 1
+        self._turn_rolls.add(self._rolls)
+        self._turn_rolls_histogram.add(self._rolls)
+        self._rolls = 0
+
+    def game_started(self, players, seed):
+        """Start counting a new game."""
+
+        self._seats = {id(player): seat for seat, player in enumerate(players)}
+        self._rolls = 0
+        self._game_rolls_so_far = 0
+
+    def rolled(self, player, roll):
+        """Count a roll."""
+
+        self._rolls += 1
+        self._game_rolls_so_far += 1
+
+    def busted(self, player, roll):
+        """Count a roll of 1 and end the turn."""
+
+        self._rolls += 1
+        self._game_rolls_so_far += 1
+        self._busts += 1
+        self._end_turn()
+
+    def reached_target(self, player, roll):
+        """Count the winning roll and end the turn."""
+
+        self._rolls += 1
+        self._game_rolls_so_far += 1
+        self._end_turn()
+
+    def held(self, player):
+        """End the turn."""
+
+        self._end_turn()
+
+    def leaderboard(self, players):
+        """Add the finished game."""
+
+        scores = [0] * len(self._seats)
+        for player in players:
+            scores[self._seats[id(player)]] = player.get_total_score()
+        # The first seat with the highest score wins a timed game
+        winner = scores.index(max(scores))
+        self._add_game(winner, scores, self._game_rolls_so_far)
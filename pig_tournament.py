@@ -0,0 +1,896 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_tournament.py: Multi-core tournament runner for Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import os
+import sys
+import math
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from pig import ComputerPlayer, Rules, simulate
+from pig_stats import GameStats
+
+
+class TournamentReport(object):
+    """This class is used to store the merged results of a tournament.
+
+    Only integer totals are kept, so reports can be merged in any
+    order and still give identical results. A report can also keep
+    streaming GameStats, which are merged along with it.
+
+    Attributes:
+        _n_games (int): The number of games played.
+        _wins (list): The number of games won by each seat.
+        _scores (list): The sum of the total scores of each seat.
+        _rolls (list): The sum of the number of rolls of each seat.
+        _stats (GameStats): The summary statistics of the games, or None.
+    """
+
+    def __init__(self, n_players, stats=False):
+        """
+        The constructor for TournamentReport class.
+
+        Parameters:
+            n_players (int): The number of players in each game.
+            stats (bool): Whether or not to keep summary statistics of
+                          the games. Defaults to False.
+        """
+
+        self._n_games = 0
+        self._wins = [0] * n_players
+        self._scores = [0] * n_players
+        self._rolls = [0] * n_players
+        self._stats = GameStats() if stats else None
+
+    def get_n_games(self):
+        """
+        The getter for the _n_games attribute.
+
+        Returns:
+            (int): The number of games played.
+        """
+
+        return self._n_games
+
+    def get_wins(self):
+        """
+        The getter for the _wins attribute.
+
+        Returns:
+            (list): The number of games won by each seat.
+        """
+
+        return list(self._wins)
+
+    def get_scores(self):
+        """
+        The getter for the _scores attribute.
+
+        Returns:
+            (list): The sum of the total scores of each seat.
+        """
+
+        return list(self._scores)
+
+    def get_rolls(self):
+        """
+        The getter for the _rolls attribute.
+
+        Returns:
+            (list): The sum of the number of rolls of each seat.
+        """
+
+        return list(self._rolls)
+
+    def get_stats(self):
+        """
+        The getter for the _stats attribute.
+
+        Returns:
+            (GameStats): The summary statistics of the games, or None
+                         if the report does not keep them.
+        """
+
+        return self._stats
+
+    def get_win_rates(self):
+        """
+        A method to get the win rate of each seat.
+
+        Returns:
+            (list): The fraction of games won by each seat.
+        """
+
+        return [wins / self._n_games if self._n_games else 0.0
+                for wins in self._wins]
+
+    def add_result(self, result):
+        """
+        A method to add the results of a simulation to the report.
+
+        Parameters:
+            result (SimulationResult): The results to add.
+        """
+
+        n_players = result.get_n_players()
+        scores = result.get_scores()
+        rolls = result.get_rolls()
+        self._n_games += len(result)
+        for seat, wins in enumerate(result.get_win_counts()):
+            self._wins[seat] += wins
+            self._scores[seat] += int(sum(scores[seat::n_players]))
+            self._rolls[seat] += int(sum(rolls[seat::n_players]))
+        if self._stats is not None:
+            self._stats.add_result(result)
+
+    def merge(self, other):
+        """
+        A method to merge another report into this report.
+
+        Parameters:
+            other (TournamentReport): The report to merge.
+        """
+
+        self._n_games += other._n_games
+        for seat in range(len(self._wins)):
+            self._wins[seat] += other._wins[seat]
+            self._scores[seat] += other._scores[seat]
+            self._rolls[seat] += other._rolls[seat]
+        if self._stats is not None and other._stats is not None:
+            self._stats.merge(other._stats)
+
+    def print_report(self):
+        """The method to print the report as a table."""
+
+        print("\nTOURNAMENT ({} games)\n".format(self._n_games))
+        print("+-{:<10}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*10, "-"*10, "-"*10, "-"*10))
+        print("| {:<10} | {:>10} | {:>10} | {:>10} |".format(
+            'Seat', 'Wins', 'Avg Score', 'Avg Rolls'))
+        for seat, wins in enumerate(self._wins):
+            print("|-{:<10}-+-{:>10}-+-{:>10}-+-{:>10}-|".format("-"*10, "-"*10, "-"*10, "-"*10))
+            print("| {:<10} | {:>10} | {:>10.2f} | {:>10.2f} |".format(
+                "Player {}".format(seat + 1), wins,
+                self._scores[seat] / max(self._n_games, 1),
+                self._rolls[seat] / max(self._n_games, 1)))
+        print("+-{:<10}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*10, "-"*10, "-"*10, "-"*10))
+
+
+def _play_chunk(n_games, strategies, seed_sequence, stats=False, rules=None):
+    """
+    Plays one chunk of a tournament in a worker process.
+
+    Parameters:
+        n_games (int): The number of games in the chunk.
+        strategies (sequence): The player class for each seat.
+        seed_sequence (SeedSequence): The chunk's seed sequence.
+        stats (bool): Whether or not to keep summary statistics.
+                      Defaults to False.
+        rules (Rules): The rules of the games. Defaults to None, which
+                       plays the standard rules.
+
+    Returns:
+        (TournamentReport): The results of the chunk.
+    """
+
+    # Turn the chunk's stream into a 128-bit seed for simulate
+    seed = int.from_bytes(seed_sequence.generate_state(4).tobytes(), 'little')
+    report = TournamentReport(len(strategies), stats)
+    report.add_result(simulate(n_games, strategies, seed, rules))
+    return report
+
+
+def run_tournament(n_games, strategies=(ComputerPlayer, ComputerPlayer),
+                   seed=0, workers=None, chunk_size=10000, stats=False):
+    """
+    Plays games of Pig across a pool of worker processes.
+
+    The games are split into fixed-size chunks and every chunk gets
+    its own stream spawned from the master seed. The split does not
+    depend on the number of workers, so the same master seed always
+    gives the same report. Only one chunk's games are kept in memory
+    by each worker at a time.
+
+    Parameters:
+        n_games (int): The number of games to play.
+        strategies (sequence): The player class for each seat, in
+                               turn order. Defaults to two
+                               ComputerPlayers.
+        seed (int): The master seed of the tournament.
+        workers (int): The number of worker processes. Defaults to
+                       the number of CPUs.
+        chunk_size (int): The number of games in each chunk.
+        stats (bool): Whether or not the report keeps summary
+                      statistics of the games. Defaults to False.
+
+    Returns:
+        (TournamentReport): The merged results of the tournament.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(chunk_size, n_games - start) for start in range(0, n_games, chunk_size)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    report = TournamentReport(len(strategies), stats)
+
+    # Play in-process when there is nothing to parallelize
+    if workers == 1 or len(sizes) == 1:
+        for size, stream in zip(sizes, streams):
+            report.merge(_play_chunk(size, strategies, stream, stats))
+        return report
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_play_chunk, sizes,
+                                  [strategies] * len(sizes), streams,
+                                  [stats] * len(sizes)):
+            report.merge(chunk)
+
+    return report
+
+
+def _cell_key(first, second, seed, n_games):
+    """
+    Returns the cache key of a sweep cell.
+
+    Parameters:
+        first (tuple): The (hold threshold, target) of the first player.
+        second (tuple): The (hold threshold, target) of the second player.
+        seed (int): The master seed of the sweep.
+        n_games (int): The number of games in the cell.
+
+    Returns:
+        (str): The cache key.
+    """
+
+    return "{}/{}:{}/{}:{}:{}".format(first[0], first[1], second[0], second[1],
+                                      seed, n_games)
+
+
+def _play_cell(first, second, seed, n_games):
+    """
+    Plays the games of one sweep cell in a worker process.
+
+    The cell's stream is derived from the master seed and both players'
+    parameters, so a cell always gives the same result. The games are
+    played to the players' target.
+
+    Parameters:
+        first (tuple): The (hold threshold, target) of the first player.
+        second (tuple): The (hold threshold, target) of the second player.
+        seed (int): The master seed of the sweep.
+        n_games (int): The number of games in the cell.
+
+    Returns:
+        (int): The number of games won by the first player.
+    """
+
+    rules = Rules(target=first[1])
+    strategies = (partial(ComputerPlayer, hold_at=first[0], rules=rules),
+                  partial(ComputerPlayer, hold_at=second[0], rules=rules))
+    stream = np.random.SeedSequence([seed, first[0], first[1], second[0], second[1]])
+    return _play_chunk(n_games, strategies, stream, rules=rules).get_wins()[0]
+
+
+def _write_cache(cache_path, cache):
+    """
+    Writes a sweep cache under a temporary name and renames it into
+    place, so the file is never left partly written.
+
+    Parameters:
+        cache_path (str): The path of the cache file.
+        cache (dict): The win counts of the cells, by cache key.
+    """
+
+    temporary = "{}.{}.tmp".format(cache_path, os.getpid())
+    with open(temporary, "w") as cache_file:
+        json.dump(cache, cache_file, indent=1, sort_keys=True)
+    os.replace(temporary, cache_path)
+
+
+def sweep(thresholds, n_games, seed=0, target=100, cache_path=None, workers=None):
+    """
+    Plays every pair of ComputerPlayer hold thresholds against each other.
+
+    Each cell's result is stored in a JSON cache file keyed by both
+    players' parameters, the seed and the number of games, as soon as
+    the cell finishes, so running the sweep again, even after an
+    interruption, only plays the cells that are not cached yet.
+
+    Parameters:
+        thresholds (sequence): The hold thresholds to compare.
+        n_games (int): The number of games per cell.
+        seed (int): The master seed of the sweep.
+        target (int): The score the games are played to. Defaults to
+                      100.
+        cache_path (str): The path of the cache file. Defaults to None,
+                          which disables the cache.
+        workers (int): The number of worker processes. Defaults to
+                       the number of CPUs.
+
+    Returns:
+        (list): The win rate of the first player for each pair, as
+                rows for the first player's threshold and columns for
+                the second player's.
+    """
+
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as cache_file:
+            cache = json.load(cache_file)
+
+    cells = [((first, target), (second, target))
+             for first in thresholds for second in thresholds]
+    missing = [cell for cell in cells
+               if _cell_key(cell[0], cell[1], seed, n_games) not in cache]
+
+    # Only play the cells that are not cached yet
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            wins = executor.map(_play_cell,
+                                [cell[0] for cell in missing],
+                                [cell[1] for cell in missing],
+                                [seed] * len(missing),
+                                [n_games] * len(missing))
+            for cell, cell_wins in zip(missing, wins):
+                cache[_cell_key(cell[0], cell[1], seed, n_games)] = cell_wins
+                # Save every cell as it comes in, so an interrupted
+                # sweep keeps the cells it finished
+                if cache_path:
+                    _write_cache(cache_path, cache)
+
+    return [[cache[_cell_key((first, target), (second, target), seed, n_games)] / n_games
+             for second in thresholds]
+            for first in thresholds]
+
+
+class EloRatings(object):
+    """This class is used to keep Elo ratings of strategies.
+
+    Ratings are updated match by match as the results come in, each
+    match scored against the current ratings, so they are always
+    current and never recomputed from the history. A match of one game
+    moves the ratings exactly like ordinary Elo, and every further game
+    damps the step, so a long match moves the gap towards the one its
+    win rate implies instead of overshooting it.
+
+    Attributes:
+        _k (float): The largest rating change a single game can cause.
+        _initial (float): The rating of a new strategy.
+        _ratings (dict): The rating of each strategy.
+        _games (dict): The number of games played by each strategy.
+        _wins (dict): The number of games won by each strategy.
+    """
+
+    def __init__(self, k=16, initial=1500):
+        """
+        The constructor for EloRatings class.
+
+        Parameters:
+            k (float): The largest rating change a single game can
+                       cause. Defaults to 16.
+            initial (float): The rating of a new strategy. Defaults to
+                             1500.
+        """
+
+        self._k = k
+        self._initial = initial
+        self._ratings = {}
+        self._games = {}
+        self._wins = {}
+
+    def get_rating(self, name):
+        """
+        A method to get a strategy's rating.
+
+        Parameters:
+            name (str): The strategy's name.
+
+        Returns:
+            (float): The strategy's rating.
+        """
+
+        return self._ratings.get(name, self._initial)
+
+    def expected_score(self, first, second):
+        """
+        A method to get the expected share of games won by a strategy.
+
+        Parameters:
+            first (str): The strategy's name.
+            second (str): The opponent's name.
+
+        Returns:
+            (float): The expected fraction of games won by first.
+        """
+
+        return 1.0 / (1.0 + 10 ** ((self.get_rating(second) - self.get_rating(first)) / 400.0))
+
+    def _change(self, first, second, wins, games):
+        """
+        Returns the rating change of a match for its first strategy.
+
+        Parameters:
+            first (str): The name of one strategy.
+            second (str): The name of the other strategy.
+            wins (int): The number of games won by first.
+            games (int): The number of games played.
+
+        Returns:
+            (float): The change, which second loses.
+        """
+
+        expected = self.expected_score(first, second)
+        # A damped Newton step on the rating gap, which is ordinary Elo
+        # for one game and half the gap correction for long matches
+        slope = expected * (1.0 - expected) * math.log(10) / 400.0
+        return self._k * (wins - games * expected) / (1.0 + 2.0 * self._k * (games - 1) * slope)
+
+    def update(self, first, second, wins, games):
+        """
+        A method to add the result of a match.
+
+        Parameters:
+            first (str): The name of one strategy.
+            second (str): The name of the other strategy.
+            wins (int): The number of games won by first.
+            games (int): The number of games played.
+        """
+
+        change = self._change(first, second, wins, games)
+        self._ratings[first] = self.get_rating(first) + change
+        self._ratings[second] = self.get_rating(second) - change
+        for name, won in ((first, wins), (second, games - wins)):
+            self._games[name] = self._games.get(name, 0) + games
+            self._wins[name] = self._wins.get(name, 0) + won
+
+    def get_ranking(self):
+        """
+        A method to get the strategies from the highest rating down.
+
+        Returns:
+            (list): The name, rating, games and wins of each strategy.
+        """
+
+        return sorted(((name, self.get_rating(name), self._games[name], self._wins[name])
+                       for name in self._games),
+                      key=lambda entry: -entry[1])
+
+    def print_ranking(self):
+        """The method to print the ranking as a table."""
+
+        print("\nRATINGS\n")
+        print("+-{:<24}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*24, "-"*10, "-"*10, "-"*10))
+        print("| {:<24} | {:>10} | {:>10} | {:>10} |".format('Strategy', 'Rating', 'Games', 'Win %'))
+        for name, rating, games, wins in self.get_ranking():
+            print("|-{:<24}-+-{:>10}-+-{:>10}-+-{:>10}-|".format("-"*24, "-"*10, "-"*10, "-"*10))
+            print("| {:<24} | {:>10.1f} | {:>10} | {:>10.2f} |".format(
+                name, rating, games, 100.0 * wins / games))
+        print("+-{:<24}-+-{:>10}-+-{:>10}-+-{:>10}-+".format("-"*24, "-"*10, "-"*10, "-"*10))
+
+
+def _play_match(n_games, strategies, seed_sequence):
+    """
+    Plays one match between two strategies in a worker process.
+
+    Parameters:
+        n_games (int): The number of games in the match.
+        strategies (tuple): The player class of each seat.
+        seed_sequence (SeedSequence): The match's seed sequence.
+
+    Returns:
+        (int): The number of games won by the first seat.
+    """
+
+    return _play_chunk(n_games, strategies, seed_sequence).get_wins()[0]
+
+
+def _play_round(pairs, roster, n_games, seed, ratings, executor, round_number=0):
+    """
+    Plays a match for every pair, with each strategy taking the first
+    seat in half of the games. Each pair is rated as soon as both of
+    its halves are in, in the order of the pairs, so the ratings do not
+    depend on which worker finishes first.
+
+    Parameters:
+        pairs (list): The pairs of strategy names to play.
+        roster (dict): The player class of each strategy, by name.
+        n_games (int): The number of games per pair.
+        seed (int): The master seed of the tournament.
+        ratings (EloRatings): The ratings to update.
+        executor (Executor): The worker pool, or None to play in-process.
+        round_number (int): The round, which gives its matches their
+                            own streams. Defaults to 0.
+    """
+
+    names = list(roster)
+    matches = []
+    for first, second in pairs:
+        # Swap seats to cancel the first player's advantage
+        halves = [(leader, follower, (n_games + 1 - order) // 2)
+                  for order, (leader, follower) in enumerate(((first, second), (second, first)))
+                  if (n_games + 1 - order) // 2]
+        for half, (leader, follower, games) in enumerate(halves, 1):
+            stream = np.random.SeedSequence(
+                [seed, round_number, names.index(leader), names.index(follower)])
+            matches.append((leader, follower, games, stream, half == len(halves)))
+
+    results = (executor.map if executor is not None else map)(
+        _play_match,
+        [games for _, _, games, _, _ in matches],
+        [(roster[leader], roster[follower]) for leader, follower, _, _, _ in matches],
+        [stream for _, _, _, stream, _ in matches])
+    # Results come back in order, so both seat orders of a pair are put
+    # together into one result and rated against the current ratings
+    pair_wins = pair_games = 0
+    first = None
+    for (leader, follower, games, _, last), wins in zip(matches, results):
+        if first is None:
+            first, second = leader, follower
+        pair_wins += wins if leader == first else games - wins
+        pair_games += games
+        if last:
+            ratings.update(first, second, pair_wins, pair_games)
+            pair_wins = pair_games = 0
+            first = None
+
+
+def round_robin(roster, n_games, seed=0, workers=None, ratings=None):
+    """
+    Plays every strategy of a roster against every other.
+
+    Parameters:
+        roster (dict): The player class of each strategy, by name.
+        n_games (int): The number of games per pair of strategies.
+        seed (int): The master seed of the tournament.
+        workers (int): The number of worker processes. Defaults to
+                       the number of CPUs.
+        ratings (EloRatings): The ratings to update. Defaults to None,
+                              which starts every strategy at 1500.
+
+    Returns:
+        (EloRatings): The updated ratings.
+    """
+
+    ratings = ratings if ratings is not None else EloRatings()
+    names = list(roster)
+    pairs = [(first, second) for index, first in enumerate(names) for second in names[index + 1:]]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _play_round(pairs, roster, n_games, seed, ratings, None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _play_round(pairs, roster, n_games, seed, ratings, executor)
+    return ratings
+
+
+def swiss(roster, n_games, rounds, seed=0, workers=None, ratings=None):
+    """
+    Plays rounds in which strategies with similar ratings meet.
+
+    Each round pairs the strategies from the highest rating down with
+    the next strategy they have not met yet. With an odd number of
+    strategies the lowest rated unpaired strategy sits the round out.
+
+    Parameters:
+        roster (dict): The player class of each strategy, by name.
+        n_games (int): The number of games per pair of strategies.
+        rounds (int): The number of rounds.
+        seed (int): The master seed of the tournament.
+        workers (int): The number of worker processes. Defaults to
+                       the number of CPUs.
+        ratings (EloRatings): The ratings to update. Defaults to None,
+                              which starts every strategy at 1500.
+
+    Returns:
+        (EloRatings): The updated ratings.
+    """
+
+    ratings = ratings if ratings is not None else EloRatings()
+    names = list(roster)
+    met = set()
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for round_number in range(rounds):
+            # Order by rating, keeping the roster order between equals
+            waiting = sorted(names, key=lambda name: (-ratings.get_rating(name), names.index(name)))
+            pairs = []
+            while len(waiting) > 1:
+                first = waiting.pop(0)
+                second = next((name for name in waiting if frozenset((first, name)) not in met),
+                              waiting[0])
+                waiting.remove(second)
+                met.add(frozenset((first, second)))
+                pairs.append((first, second))
+            _play_round(pairs, roster, n_games, seed, ratings, executor, round_number)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return ratings
+
+
+def _play_batch(first, second, size, seed, number):
+    """
+    Plays one batch of an adaptive comparison in a worker process,
+    each strategy taking the first seat in half of its games.
+
+    Parameters:
+        first (class): The player class of the first strategy.
+        second (class): The player class of the second strategy.
+        size (int): The number of games in the batch.
+        seed (int): The master seed of the comparison.
+        number (int): The batch's number, which gives it its streams.
+
+    Returns:
+        (int): The number of games won by the first strategy.
+    """
+
+    wins = 0
+    for order in (0, 1):
+        games = (size + 1 - order) // 2
+        if games:
+            stream = np.random.SeedSequence([seed, number, order])
+            if order:
+                wins += games - _play_match(games, (second, first), stream)
+            else:
+                wins += _play_match(games, (first, second), stream)
+    return wins
+
+
+def compare_adaptive(first, second, precision=0.01, confidence=0.95, batch=2000,
+                     max_games=1000000, seed=0, workers=None):
+    """
+    Plays two strategies against each other until it is clear which
+    one is better.
+
+    Games are played in batches, each strategy taking the first seat
+    in half of every batch. After each batch, in order, the first
+    strategy's win rate gets a Wilson score interval. Play stops as
+    soon as the interval excludes an even match, or is narrower than
+    the precision on each side, or the game limit is reached. The
+    confidence is split over the batches, the k-th batch getting a
+    6 / (pi k)^2 share of the error rate, so stopping at whichever
+    batch decides keeps the overall error rate within the confidence.
+    Workers play ahead on later batches, whose results are dropped if
+    an earlier batch decides, so a seed gives the same result for any
+    number of workers.
+
+    Parameters:
+        first (class): The player class of the first strategy.
+        second (class): The player class of the second strategy.
+        precision (float): The half width of the interval at which two
+                           strategies count as even. Defaults to 0.01.
+        confidence (float): The probability that the decision is right.
+                            Defaults to 0.95.
+        batch (int): The number of games per batch. Defaults to 2000.
+        max_games (int): The most games to play. The last batch is cut
+                         short to stay within it. Defaults to 1000000.
+        seed (int): The master seed of the comparison.
+        workers (int): The number of worker processes. Defaults to the
+                       number of CPUs.
+
+    Returns:
+        (dict): The games played, the first strategy's wins, win rate
+                and interval, the better strategy ("first", "second"
+                or None if they are even within the precision or the
+                limit was reached) and why play stopped ("decided",
+                "precision" or "limit").
+    """
+
+    from collections import deque
+    from statistics import NormalDist
+    from pig_vector import wilson_interval
+
+    if batch < 2 or max_games < 2:
+        raise ValueError("A batch and the game limit need at least 2 games.")
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    games = wins = planned = number = 0
+    low, high = 0.0, 1.0
+    stopped = "limit"
+    # The batches handed out and not checked yet, oldest first
+    pending = deque()
+    try:
+        while games < max_games:
+            # Keep every worker busy with the batches that come next
+            while planned < max_games and (not pending or len(pending) < 2 * workers
+                                           and executor is not None):
+                size = min(batch, max_games - planned)
+                job = (first, second, size, seed, number)
+                pending.append((size, job, executor.submit(_play_batch, *job)
+                                if executor is not None else None))
+                planned += size
+                number += 1
+
+            size, job, future = pending.popleft()
+            wins += future.result() if future is not None else _play_batch(*job)
+            games += size
+
+            # Check the interval at this batch's share of the error rate
+            look = job[4] + 1
+            alpha = (1.0 - confidence) * 6.0 / (math.pi * look) ** 2
+            low, high = wilson_interval(wins, games, NormalDist().inv_cdf(1.0 - alpha / 2.0))
+            if low > 0.5 or high < 0.5:
+                stopped = "decided"
+                break
+            if high - low <= 2.0 * precision:
+                stopped = "precision"
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return {"games": games, "wins": wins, "win_rate": wins / games if games else 0.0,
+            "low": low, "high": high,
+            "better": ("first" if low > 0.5 else "second") if stopped == "decided" else None,
+            "stopped": stopped}
+
+def parse_roster(text):
+    """
+    Builds a roster from a comma-separated list of strategies.
+
+    Parameters:
+        text (str): The strategies, each computer[:hold threshold],
+                    optimal or search[:milliseconds per move].
+
+    Returns:
+        (dict): The player class of each strategy, by name.
+    """
+
+    roster = {}
+    for entry in text.split(","):
+        kind, _, parameter = entry.strip().lower().partition(":")
+        if kind == "computer":
+            roster[entry.strip()] = partial(ComputerPlayer, hold_at=int(parameter or 25))
+        elif kind == "optimal":
+            from pig_optimal import OptimalComputerPlayer, PolicyTable
+            # Solve the table once here rather than in every worker
+            PolicyTable.load()
+            roster[entry.strip()] = OptimalComputerPlayer
+        elif kind == "search":
+            from pig_search import SearchComputerPlayer
+            roster[entry.strip()] = partial(SearchComputerPlayer,
+                                            budget=float(parameter or 5) / 1000)
+        else:
+            raise ValueError("Unknown strategy {!r}.".format(entry))
+    return roster
+
+
+def main():
+    """The method that runs when the program is executed."""
+
+    # Setup arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--roster',
+                        help='Comma-separated strategies, each computer[:hold threshold], optimal '
+                             'or search[:milliseconds per move], e.g. computer:15,computer:25,optimal.',
+                        type=str
+                        )
+    parser.add_argument('--games',
+                        help='The number of games per pair of strategies. Defaults to 1000.',
+                        default=1000,
+                        type=int
+                        )
+    parser.add_argument('--swiss',
+                        help='Play this many Swiss rounds instead of a round robin.',
+                        type=int
+                        )
+    parser.add_argument('--adaptive',
+                        action='store_true',
+                        help='Compare the two strategies of the roster, playing batches until the '
+                             'better one is clear. --games is then the most games to play.'
+                        )
+    parser.add_argument('--precision',
+                        help='With --adaptive, the half width of the win rate interval at which '
+                             'the strategies count as even. Defaults to 0.01.',
+                        default=0.01,
+                        type=float
+                        )
+    parser.add_argument('--confidence',
+                        help='With --adaptive, the probability that the decision is right. '
+                             'Defaults to 0.95.',
+                        default=0.95,
+                        type=float
+                        )
+    parser.add_argument('--batch',
+                        help='With --adaptive, the number of games per batch. Defaults to 2000, '
+                             'or a tenth of --games if that is smaller.',
+                        type=int
+                        )
+    parser.add_argument('--sweep',
+                        help='Comma-separated ComputerPlayer hold thresholds to play against each '
+                             'other instead of a roster, e.g. 15,20,25,30.',
+                        type=str
+                        )
+    parser.add_argument('--target',
+                        help='With --sweep, the score the games are played to. Defaults to 100.',
+                        default=100,
+                        type=int
+                        )
+    parser.add_argument('--cache',
+                        help='With --sweep, the path of a cache file, so only new cells are played.',
+                        type=str
+                        )
+    parser.add_argument('--seed',
+                        help='The master seed of the tournament. Defaults to 0.',
+                        default=0,
+                        type=int
+                        )
+    parser.add_argument('--workers',
+                        help='The number of worker processes. Defaults to the number of CPUs.',
+                        type=int
+                        )
+    args = parser.parse_args()
+
+    if args.sweep:
+        try:
+            thresholds = [int(threshold) for threshold in args.sweep.split(",")]
+        except ValueError:
+            print("Hold thresholds must be whole numbers. Please try again.")
+            sys.exit(2)
+        if args.target < 1 or min(thresholds) < 1:
+            print("Hold thresholds and the target must be at least 1. Please try again.")
+            sys.exit(2)
+        rates = sweep(thresholds, args.games, args.seed, args.target, args.cache, args.workers)
+
+        # Print the first player's win rate for every pair
+        print("\nWIN RATE OF THE FIRST PLAYER (rows) AGAINST THE SECOND (columns)\n")
+        print("+-{:>10}-+".format("-"*10) + "-{:>8}-+".format("-"*8) * len(thresholds))
+        print("| {:>10} |".format('Hold at') +
+              "".join(" {:>8} |".format(threshold) for threshold in thresholds))
+        for threshold, row in zip(thresholds, rates):
+            print("|-{:>10}-+".format("-"*10) + "-{:>8}-+".format("-"*8) * (len(thresholds) - 1) +
+                  "-{:>8}-|".format("-"*8))
+            print("| {:>10} |".format(threshold) +
+                  "".join(" {:>8.2%} |".format(rate) for rate in row))
+        print("+-{:>10}-+".format("-"*10) + "-{:>8}-+".format("-"*8) * len(thresholds))
+        return
+
+    if not args.roster:
+        print("Either --roster or --sweep is required. Please try again.")
+        sys.exit(2)
+
+    try:
+        roster = parse_roster(args.roster)
+    except ValueError as error:
+        print("{} Please try again.".format(error))
+        sys.exit()
+
+    if args.adaptive:
+        if len(roster) != 2:
+            print("An adaptive comparison needs exactly two strategies. Please try again.")
+            sys.exit()
+        batch = args.batch if args.batch is not None else max(2, min(2000, args.games // 10))
+        if batch < 2 or args.games < batch:
+            print("--batch must be at least 2 and at most --games. Please try again.")
+            sys.exit(2)
+        (first_name, first), (second_name, second) = roster.items()
+        result = compare_adaptive(first, second, args.precision, args.confidence, batch,
+                                  args.games, args.seed, args.workers)
+        better = {"first": first_name, "second": second_name}.get(result["better"])
+        print("\n{} won {} of {} games ({:.2%}, interval {:.2%} to {:.2%}).".format(
+            first_name, result["wins"], result["games"], result["win_rate"],
+            result["low"], result["high"]))
+        if better:
+            print("{} is the better strategy.".format(better))
+        elif result["stopped"] == "precision":
+            print("The strategies are even to within {:.2%}.".format(args.precision))
+        else:
+            print("The game limit was reached before the comparison was decided.")
+        return
+
+    if args.swiss:
+        ratings = swiss(roster, args.games, args.swiss, args.seed, args.workers)
+    else:
+        ratings = round_robin(roster, args.games, args.seed, args.workers)
+    ratings.print_ranking()
+
+
+if __name__ == '__main__':
+    main()
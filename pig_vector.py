@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""pig_vector.py: NumPy-vectorized Monte Carlo simulation of Pig."""
+
+__author__ = 'Adam Volin'
+__email__ = 'Adam.Volin56@spsmail.cuny.edu'
+
+# Imports
+import math
+import numpy as np
+from pig import SimulationResult
+
+
+def simulate_vectorized(n_games, n_players=2, seed=0):
+    """
+    Plays games of Pig between ComputerPlayers in lockstep.
+
+    Every unfinished game makes one decision per step, using the same
+    rule as ComputerPlayer.request_action, and the rolls for a step are
+    drawn in a single batch. The rules are the same as in Game and
+    simulate, so the results follow the same distribution.
+
+    Parameters:
+        n_games (int): The number of games to play.
+        n_players (int): The number of ComputerPlayers in each game.
+                         Defaults to 2.
+        seed (int): The seed for the games' random generator.
+
+    Returns:
+        (SimulationResult): The results of the games, backed by
+                            NumPy arrays.
+    """
+
+    if n_players < 1:
+        raise ValueError("At least one player is required.")
+
+    rng = np.random.default_rng(seed)
+
+    # The results for every game
+    winners = np.zeros(n_games, dtype=np.uint8)
+    scores = np.zeros((n_games, n_players), dtype=np.uint16)
+    rolls = np.zeros((n_games, n_players), dtype=np.uint32)
+
+    # The state of the unfinished games only, with the scores and
+    # rolls flattened so a game's active seat is a single index
+    games = np.arange(n_games)
+    totals = np.zeros(n_games * n_players, dtype=np.int16)
+    counts = np.zeros(n_games * n_players, dtype=np.uint32)
+    turn = np.zeros(n_games, dtype=np.int16)
+    active = np.zeros(n_games, dtype=np.int16)
+    live = np.ones(n_games, dtype=bool)
+    remaining = n_games
+
+    while remaining:
+        slots = np.arange(0, games.size * n_players, n_players) + active
+        banked = totals[slots]
+
+        # The ComputerPlayer rule: roll until the turn reaches 25 or
+        # would reach 100
+        rolling = turn < np.minimum(25, 100 - (banked + turn))
+        holding = ~rolling
+
+        # Players who hold bank their turn
+        totals[slots] += np.where(holding, turn, 0)
+
+        # Draw one roll per game in a single batch
+        roll = rng.integers(1, 7, size=games.size, dtype=np.int16)
+        counts[slots] += rolling
+        bust = rolling & (roll == 1)
+
+        # A hold or a 1 ends the turn and passes the die
+        scoring = rolling & ~bust
+        turn = np.where(scoring, turn + roll, 0).astype(np.int16)
+        passing = holding | bust
+        active = np.where(passing, (active + 1) % n_players, active).astype(np.int16)
+
+        # A player wins as soon as the banked and turn scores reach 100
+        won = live & scoring & (banked + turn >= 100)
+        if won.any():
+            totals[slots[won]] += turn[won]
+            finished = games[won]
+            winners[finished] = active[won]
+            scores[finished] = totals.reshape(-1, n_players)[won]
+            rolls[finished] = counts.reshape(-1, n_players)[won]
+            live &= ~won
+            remaining -= finished.size
+
+            # Finished games are left to run idle until enough of them
+            # pile up, then dropped from the working state together
+            if remaining <= games.size * 3 // 4:
+                games = games[live]
+                totals = totals.reshape(-1, n_players)[live].ravel()
+                counts = counts.reshape(-1, n_players)[live].ravel()
+                turn = turn[live]
+                active = active[live]
+                live = live[live]
+
+    return SimulationResult(n_players, winners, scores.ravel(), rolls.ravel())
+
+
+def win_rate(result, seat=0, z=1.96):
+    """
+    Estimates a seat's win rate with a Wilson score interval.
+
+    Parameters:
+        result (SimulationResult): The results of the games.
+        seat (int): The seat to estimate the win rate for.
+                    Defaults to 0.
+        z (float): The z-score of the interval. Defaults to 1.96,
+                   a 95% interval.
+
+    Returns:
+        (tuple): The estimated win rate and the lower and upper
+                 bounds of the interval.
+    """
+
+    wins = int(np.count_nonzero(np.asarray(result.get_winners()) == seat))
+    return (wins / len(result),) + wilson_interval(wins, len(result), z)
+
+
+def wilson_interval(wins, n, z=1.96):
+    """
+    Computes the Wilson score interval for a win rate.
+
+    Parameters:
+        wins (int): The number of wins.
+        n (int): The number of games.
+        z (float): The z-score of the interval. Defaults to 1.96,
+                   a 95% interval.
+
+    Returns:
+        (tuple): The lower and upper bounds of the interval.
+    """
+
+    if n == 0:
+        return (0.0, 1.0)
+
+    p = wins / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))